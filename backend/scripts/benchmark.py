@@ -0,0 +1,728 @@
+"""
+Benchmarks for the API and the test_db importer.
+
+Usage:
+    python backend/scripts/benchmark.py suite [--rows 10000] [--requests 2000] [--concurrency 16]
+                                              [--output results.json] [--compare baseline.json]
+    python backend/scripts/benchmark.py read-path [--rows 10000] [--requests 5000] [--url URL]
+    python backend/scripts/benchmark.py serialization [--rows 10000] [--page-sizes 100,1000,10000]
+    python backend/scripts/benchmark.py debug-logging [--rows 10000] [--limit 100] [--requests 2000]
+    python backend/scripts/benchmark.py metrics [--requests 50000]
+    python backend/scripts/benchmark.py login [--requests 400] [--concurrency 32] [--rounds 12]
+    python backend/scripts/benchmark.py tokens [--rows 10000] [--requests 20000]
+    python backend/scripts/benchmark.py compression [--rows 10000] [--page-sizes 100,1000,10000]
+
+suite           Load test: seed employees, drive the full application (middleware included) in-process
+                through httpx/ASGI with --concurrency clients, and report requests/second and
+                p50/p95/p99 for /health, /employees at each --page-sizes, /employees/{id} and
+                /auth/login. Also parses a synthetic test_db dump of --import-rows employees and,
+                when --url is Postgres, runs the full COPY import into it. Results are written as
+                JSON to --output; --compare exits non-zero when any endpoint lost more than
+                --max-regression of its requests/second or p99 against an earlier results file.
+read-path       Fetch one employee by id through the ORM session path (get_db: session, identity
+                map, BEGIN ... COMMIT) and through the Core read connection the GET routes use
+                (autocommit, rows mapped straight to response dicts), and report per-request latency.
+serialization   Request GET /employees at several page sizes through the ASGI app with
+                fast_json_responses off (response_model validation + stdlib json) and on (orjson),
+                and report requests/second and p99. Pages come from the response cache, so the
+                numbers isolate validation and encoding.
+debug-logging   Request GET /employees with request_debug_sample_rate at 0 (disabled), 0.01 and 1,
+                logging through CloudWatchFormatter to a file, and report requests/second.
+metrics         Time MetricsMiddleware around a no-op ASGI app against the bare app (pure per-request
+                overhead), and GET /health through the app with and without it.
+login           POST /auth/login from --concurrency clients against the bcrypt-hashed users table at
+                --rounds, with the verification cache off and on, and report login p50/p99 together
+                with GET /health latency measured while the logins run (bcrypt runs in the hasher's
+                thread pool, so /health should stay fast).
+tokens          Validate an access token by full decode (signature and claims) and from the validated-token
+                cache, then GET /employees/{id} anonymously and with a bearer token under auth_required,
+                counting SQL statements per request to show identity costs no database round trip.
+compression     For GET /employees at each page size, report bytes saved and CPU time per response for
+                gzip levels 1/6/9 and, when installed, brotli and zstd; then request the page through
+                the app without and with CompressionMiddleware (gzip at compression_level).
+
+Without --url a temporary SQLite database is seeded. Pass a postgresql+asyncpg URL of a scratch
+database to include real network round trips; the employees table is created and filled there.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Settings refuse to load without credentials; the benchmark brings its own database URL.
+os.environ.setdefault("DB_USERNAME", "benchmark")
+os.environ.setdefault("DB_PASSWORD", "benchmark")
+
+from sqlalchemy import delete, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+import logging  # noqa: E402
+
+import httpx  # noqa: E402
+
+from src import database  # noqa: E402
+from src.cache import response_cache  # noqa: E402
+from src.compression import CompressionMiddleware, brotli, encoders, zstandard  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.database import Base, autocommit_connection  # noqa: E402
+from src.metrics import MetricsMiddleware  # noqa: E402
+from src.utils.logger import CloudWatchFormatter, request_debug_logger  # noqa: E402
+from src.models import Employee  # noqa: E402
+from src.routes.employees import RESPONSE_COLUMNS, row_to_response, to_response  # noqa: E402
+from src.security import password_hasher, token_service  # noqa: E402
+
+POSITIONS = ["Engineer", "Senior Engineer", "Staff", "Senior Staff", "Technique Leader", "Manager"]
+DEPARTMENTS = ["Development", "Production", "Sales", "Customer Service", "Research", "Finance"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(name: str, samples: list[float], wall_seconds: float | None = None) -> dict:
+    """
+    Print and return latency statistics in microseconds. Requests/second is
+    measured over `wall_seconds` for concurrent runs, else over the summed latency.
+    """
+    micros = [s * 1e6 for s in samples]
+    stats = {
+        "requests": len(micros),
+        "mean_us": round(statistics.fmean(micros), 1),
+        "p50_us": round(percentile(micros, 50), 1),
+        "p95_us": round(percentile(micros, 95), 1),
+        "p99_us": round(percentile(micros, 99), 1),
+        "rps": round(len(micros) / (wall_seconds or sum(micros) / 1e6), 1),
+    }
+    print(f"{name:<28} mean {stats['mean_us']:>8.1f}us  p50 {stats['p50_us']:>8.1f}us  "
+          f"p95 {stats['p95_us']:>8.1f}us  p99 {stats['p99_us']:>8.1f}us  {stats['rps']:>9.1f} req/s")
+    return stats
+
+
+async def seed(engine, rows: int) -> None:
+    """Create the employees table and fill it with synthetic rows"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(Employee))
+        hired = datetime(2000, 1, 1)
+        batch = []
+        for i in range(1, rows + 1):
+            batch.append({
+                "employee_id": f"B{i:07d}",
+                "email": f"bench.{i}@blackflag.hr",
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+                "position": POSITIONS[i % len(POSITIONS)],
+                "hire_date": hired + timedelta(days=i % 9000),
+                "is_active": i % 10 != 0,
+            })
+            if len(batch) == 5000:
+                await conn.execute(insert(Employee), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(Employee), batch)
+
+
+async def bench_read_path(url: str, rows: int, requests: int) -> dict:
+    engine = create_async_engine(url)
+    await seed(engine, rows)
+    async with engine.connect() as conn:
+        ids = (await conn.execute(select(Employee.id))).scalars().all()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    lookups = [random.choice(ids) for _ in range(requests)]
+
+    async def session_path(employee_id: int) -> dict:
+        # What get_db + the ORM get_employee did per request
+        async with session_maker() as session:
+            try:
+                result = await session.execute(select(Employee).where(Employee.id == employee_id))
+                body = to_response(result.scalar_one())
+                await session.commit()
+            finally:
+                await session.close()
+        return body
+
+    async def core_path(employee_id: int) -> dict:
+        # get_read_connection + the Core get_employee
+        conn = await autocommit_connection(engine)
+        try:
+            result = await conn.execute(select(*RESPONSE_COLUMNS).where(Employee.id == employee_id))
+            return row_to_response(result.mappings().one())
+        finally:
+            await conn.close()
+
+    assert await session_path(lookups[0]) == await core_path(lookups[0])
+
+    results = {}
+    for name, path in (("orm-session", session_path), ("core-connection", core_path)):
+        for employee_id in lookups[:min(200, requests)]:
+            await path(employee_id)
+        samples = []
+        for employee_id in lookups:
+            started = time.perf_counter()
+            await path(employee_id)
+            samples.append(time.perf_counter() - started)
+        results[name] = report(name, samples)
+
+    await engine.dispose()
+    saved = results["orm-session"]["mean_us"] - results["core-connection"]["mean_us"]
+    print(f"Saving per request: {saved:.1f}us "
+          f"({saved / results['orm-session']['mean_us'] * 100:.0f}% of the session path)")
+    return results
+
+
+async def use_database(url: str, rows: int):
+    """Seed a database and point the application's engine and sessions at it"""
+    engine = create_async_engine(url)
+    await seed(engine, rows)
+    database.engine = engine
+    database.AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    from src.routes.auth import seed_test_users
+    await seed_test_users()
+    return engine
+
+
+def build_app():
+    """The application routers without the lifespan (no init_db against the configured database)"""
+    from fastapi import FastAPI
+    from src.routes import auth, employees, health
+
+    app = FastAPI()
+    app.include_router(health.router)
+    app.include_router(employees.router, prefix=settings.api_prefix)
+    app.include_router(auth.router, prefix=settings.api_prefix)
+    return app
+
+
+async def timed_requests(client: httpx.AsyncClient, url: str, requests: int, warmup: int = 5) -> list[float]:
+    for _ in range(warmup):
+        (await client.get(url)).raise_for_status()
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(url)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return samples
+
+
+async def bench_serialization(url: str, rows: int, page_sizes: list[int], requests: int) -> dict:
+    engine = await use_database(url, rows)
+    app = build_app()
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for limit in page_sizes:
+            target = f"{settings.api_prefix}/employees?limit={limit}"
+            count = max(5, requests * 100 // max(limit, 100))
+            bodies = {}
+            for fast in (False, True):
+                settings.fast_json_responses = fast
+                name = f"limit={limit} {'orjson' if fast else 'model'}"
+                samples = await timed_requests(client, target, count)
+                results[name] = report(name, samples)
+                bodies[fast] = (await client.get(target)).content
+            assert bodies[False] == bodies[True], "fast path changed the response body"
+            speedup = results[f"limit={limit} orjson"]["rps"] / results[f"limit={limit} model"]["rps"]
+            print(f"limit={limit}: {speedup:.1f}x requests/second with orjson\n")
+    await response_cache.close()
+    await engine.dispose()
+    return results
+
+
+async def bench_compression(url: str, rows: int, page_sizes: list[int], requests: int) -> dict:
+    engine = await use_database(url, rows)
+    levels = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+    if brotli is not None:
+        levels += [("br", 4), ("br", 11)]
+    if zstandard is not None:
+        levels += [("zstd", 3), ("zstd", 19)]
+    results = {}
+    plain_app = build_app()
+    compressed_app = build_app()
+    compressed_app.add_middleware(
+        CompressionMiddleware, encodings=["gzip"], gzip_level=settings.compression_level,
+        thread_min_size=settings.compression_thread_min_size,
+    )
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=plain_app), base_url="http://bench") as client:
+        for limit in page_sizes:
+            body = (await client.get(f"{settings.api_prefix}/employees?limit={limit}")).content
+            count = max(5, requests * 100 // max(limit, 100))
+            print(f"limit={limit}: {len(body) / 1024:.1f} KiB uncompressed")
+            for encoding, level in levels:
+                compress = encoders(level, level, level)[encoding]
+                samples = []
+                for _ in range(count):
+                    started = time.perf_counter()
+                    output = compress(body)
+                    samples.append(time.perf_counter() - started)
+                mean_ms = statistics.fmean(samples) * 1000
+                saved = 1 - len(output) / len(body)
+                name = f"limit={limit} {encoding}-{level}"
+                results[name] = {
+                    "raw_bytes": len(body),
+                    "compressed_bytes": len(output),
+                    "saved_pct": round(saved * 100, 1),
+                    "cpu_ms": round(mean_ms, 3),
+                    "mb_per_s": round(len(body) / 1e6 / (mean_ms / 1000), 1),
+                }
+                print(f"  {encoding}-{level:<5} {len(output) / 1024:>9.1f} KiB  saved {saved * 100:5.1f}%  "
+                      f"cpu {mean_ms:8.3f} ms  {results[name]['mb_per_s']:>7.1f} MB/s  "
+                      f"{(len(body) - len(output)) / 1024 / max(mean_ms, 1e-9):>8.1f} KiB saved per cpu ms")
+
+    print(f"\nThrough the app (gzip level {settings.compression_level}):")
+    for name, app in (("plain", plain_app), ("gzip", compressed_app)):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for limit in page_sizes:
+                target = f"{settings.api_prefix}/employees?limit={limit}"
+                count = max(5, requests * 100 // max(limit, 100))
+                label = f"limit={limit} {name}"
+                results[label] = report(label, await timed_requests(client, target, count))
+                response = await client.get(target, headers={"Accept-Encoding": "gzip"})
+                results[label]["wire_bytes"] = int(response.headers["content-length"])
+    await response_cache.close()
+    await engine.dispose()
+    return results
+
+
+async def bench_debug_logging(url: str, rows: int, limit: int, requests: int, log_path: str) -> dict:
+    engine = await use_database(url, rows)
+    app = build_app()
+    handler = logging.FileHandler(log_path)
+    handler.setFormatter(CloudWatchFormatter())
+    request_debug_logger.addHandler(handler)
+    request_debug_logger.propagate = False
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            target = f"{settings.api_prefix}/employees?limit={limit}"
+            for rate in (0.0, 0.01, 1.0):
+                settings.request_debug_sample_rate = rate
+                name = f"sample_rate={rate:g}"
+                results[name] = report(name, await timed_requests(client, target, requests))
+    finally:
+        settings.request_debug_sample_rate = 0.0
+        request_debug_logger.removeHandler(handler)
+        request_debug_logger.propagate = True
+        handler.close()
+    await response_cache.close()
+    await engine.dispose()
+    return results
+
+
+async def bench_metrics(requests: int) -> dict:
+    async def noop_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/health", "headers": []}
+    results = {}
+    for name, app in (("bare asgi", noop_app), ("metrics asgi", MetricsMiddleware(noop_app))):
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            await app(dict(scope), receive, send)
+            samples.append(time.perf_counter() - started)
+        results[name] = report(name, samples)
+    overhead = results["metrics asgi"]["mean_us"] - results["bare asgi"]["mean_us"]
+    print(f"Middleware overhead: {overhead:.2f}us per request\n")
+
+    http_requests = max(requests // 25, 100)
+    for name, instrumented in (("health bare", False), ("health metrics", True)):
+        app = build_app()
+        if instrumented:
+            app.add_middleware(MetricsMiddleware)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results[name] = report(name, await timed_requests(client, "/health", http_requests))
+    return results
+
+
+async def bench_login(url: str, requests: int, concurrency: int, rounds: int) -> dict:
+    from src.routes.auth import TEST_USERS
+
+    password_hasher.rounds = rounds
+    engine = await use_database(url, 0)
+    app = build_app()
+    prefix = settings.api_prefix
+    results = {}
+    print(f"bcrypt rounds {rounds}, {password_hasher.workers} hash workers, concurrency {concurrency}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        def login(i):
+            user = TEST_USERS[i % len(TEST_USERS)]
+            return client.post(f"{prefix}/auth/login", json={"email": user["email"], "password": user["password"]})
+
+        for cache_seconds in (0.0, 60.0):
+            password_hasher.cache_seconds = cache_seconds
+            password_hasher.clear_cache()
+            label = "cache on" if cache_seconds else "cache off"
+            health_samples: list[float] = []
+            done = asyncio.Event()
+
+            async def probe_health():
+                while not done.is_set():
+                    started = time.perf_counter()
+                    (await client.get("/health")).raise_for_status()
+                    health_samples.append(time.perf_counter() - started)
+                    await asyncio.sleep(0.005)
+
+            prober = asyncio.create_task(probe_health())
+            try:
+                results[f"login {label}"] = await drive(client, f"login {label}", login, requests, concurrency)
+            finally:
+                done.set()
+                await prober
+            results[f"health during login {label}"] = report(f"health during login {label}", health_samples)
+    await engine.dispose()
+    return results
+
+
+async def bench_tokens(url: str, rows: int, requests: int) -> dict:
+    from sqlalchemy import event
+
+    results = {}
+    token = token_service.issue(1, "bench@blackflag.hr", "Bench", "hr_admin")
+    for name, cached in (("validate decode", False), ("validate cached", True)):
+        samples = []
+        for _ in range(requests):
+            if not cached:
+                token_service.clear()
+            started = time.perf_counter()
+            assert token_service.validate(token) is not None
+            samples.append(time.perf_counter() - started)
+        results[name] = report(name, samples)
+
+    engine = await use_database(url, rows)
+    async with engine.connect() as conn:
+        ids = (await conn.execute(select(Employee.id))).scalars().all()
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    app = build_app()
+    http_requests = max(requests // 20, 100)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, headers in (("get anonymous", {}), ("get bearer", {"Authorization": f"Bearer {token}"})):
+            settings.auth_required = bool(headers)
+            await response_cache.invalidate()
+            statements = 0
+            samples = []
+            for i in range(http_requests):
+                started = time.perf_counter()
+                response = await client.get(f"{settings.api_prefix}/employees/{ids[(i * 7919) % len(ids)]}",
+                                            headers=headers)
+                samples.append(time.perf_counter() - started)
+                response.raise_for_status()
+            results[name] = report(name, samples)
+            results[name]["sql_per_request"] = round(statements / http_requests, 2)
+            print(f"{'':<28} {results[name]['sql_per_request']} SQL statements per request")
+    settings.auth_required = False
+    await response_cache.close()
+    await engine.dispose()
+    return results
+
+
+def write_test_db(path: Path, employees: int) -> None:
+    """Write a test_db-shaped dump set: multi-row INSERTs with history rows per employee"""
+    def dump(name, table, rows, per_stmt=500):
+        with open(path / name, "w") as f:
+            for i in range(0, len(rows), per_stmt):
+                f.write(f"INSERT INTO `{table}` VALUES " + ",\n".join(rows[i:i + per_stmt]) + ";\n")
+
+    depts = [f"d00{i}" for i in range(1, 10)]
+    dump("load_departments.dump", "departments", [f"('{d}','{DEPARTMENTS[i % len(DEPARTMENTS)]} {d}')" for i, d in enumerate(depts)])
+    dump("load_employees.dump", "employees", [
+        f"({10001 + i},'1960-01-01','First{i}','Last''{i}','{'MF'[i % 2]}','19{85 + i % 15}-01-01')" for i in range(employees)
+    ])
+    dept_emp, titles = [], []
+    for i in range(employees):
+        emp = 10001 + i
+        dept_emp.append(f"({emp},'{depts[i % 9]}','1985-01-01','1990-01-01')")
+        dept_emp.append(f"({emp},'{depts[(i + 1) % 9]}','1990-01-01','9999-01-01')")
+        titles.append(f"({emp},'Engineer','1985-01-01','1995-01-01')")
+        titles.append(f"({emp},'{POSITIONS[i % len(POSITIONS)]}','1995-01-01','9999-01-01')")
+    dump("load_dept_emp.dump", "dept_emp", dept_emp)
+    dump("load_titles.dump", "titles", titles)
+
+
+def phase_rates(stats) -> dict:
+    return {
+        name: {"rows": rows, "seconds": round(seconds, 4), "rows_per_second": round(rows / seconds) if seconds else None}
+        for name, rows, seconds in stats.phases
+    }
+
+
+def bench_importer(dump_path: Path, url: str) -> dict:
+    """Parse rates for every dump, plus COPY/merge rates when url points at Postgres"""
+    from sqlalchemy.engine import make_url
+    import import_test_db as importer
+
+    stats = importer.PhaseStats()
+    started = time.perf_counter()
+    rows = sum(len(batch) for _, _, batch in importer.serial_employee_batches(str(dump_path), stats))
+    stats.record("employees_parse", rows, started)
+    results = {"parse": phase_rates(stats)}
+
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        args = argparse.Namespace(
+            path=str(dump_path), host=parsed.host or "localhost", port=str(parsed.port or 5432),
+            user=parsed.username, password=parsed.password or "", database=parsed.database,
+            benchmark=False, workers=1, commit_rows=50_000, resume=False, incremental=False,
+            state_file=str(dump_path / ".import_state.json"),
+        )
+        started = time.perf_counter()
+        load_stats = importer.import_to_postgres(args)
+        results["load"] = phase_rates(load_stats)
+        results["load"]["total"] = {"rows": rows, "seconds": round(time.perf_counter() - started, 4),
+                                    "rows_per_second": round(rows / (time.perf_counter() - started))}
+    else:
+        results["load"] = None  # COPY needs Postgres
+    for phase, rates in results["parse"].items():
+        print(f"import {phase:<18} {rates['rows']:>9} rows  {rates['rows_per_second'] or 0:>12,} rows/s")
+    for phase, rates in (results["load"] or {}).items():
+        print(f"import {phase:<18} {rates['rows']:>9} rows  {rates['rows_per_second'] or 0:>12,} rows/s")
+    return results
+
+
+async def drive(client: httpx.AsyncClient, name: str, make_request, total: int, concurrency: int) -> dict:
+    """Issue `total` requests from `concurrency` concurrent clients; make_request(i) returns a response"""
+    for i in range(min(10, total)):
+        (await make_request(i)).raise_for_status()
+    samples: list[float] = []
+    errors = 0
+    indexes = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            started = time.perf_counter()
+            response = await make_request(i)
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats = report(name, samples, time.perf_counter() - started)
+    stats["errors"] = errors
+    return stats
+
+
+async def bench_suite(url: str, rows: int, requests: int, concurrency: int, page_sizes: list[int],
+                      use_cache: bool, log_path: str) -> dict:
+    from src.cache import NullCache
+    from src.routes import employees as employee_routes
+    from src.routes.auth import TEST_USERS
+    from src.utils.logger import setup_logging
+    import src.main
+
+    # Keep the app's JSON logs (one access record per request) out of the report
+    log_file = open(log_path, "w")
+    setup_logging(settings.log_level, stream=log_file)
+    if not use_cache:
+        employee_routes.response_cache = NullCache()
+
+    engine = await use_database(url, rows)
+    async with engine.connect() as conn:
+        ids = (await conn.execute(select(Employee.id))).scalars().all()
+    prefix = settings.api_prefix
+    user = TEST_USERS[0]
+    results = {}
+    print(f"{rows} employees, {requests} requests per endpoint, concurrency {concurrency}, "
+          f"cache {'on' if use_cache else 'off'}")
+    transport = httpx.ASGITransport(app=src.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        cases = [("GET /health", lambda i: client.get("/health"))]
+        for limit in page_sizes:
+            cases.append((f"GET /employees?limit={limit}",
+                          lambda i, limit=limit: client.get(f"{prefix}/employees", params={"limit": limit})))
+        cases.append(("GET /employees/{id}",
+                      lambda i: client.get(f"{prefix}/employees/{ids[(i * 7919) % len(ids)]}")))
+        cases.append(("POST /auth/login",
+                      lambda i: client.post(f"{prefix}/auth/login",
+                                            json={"email": user["email"], "password": user["password"]})))
+        for name, make_request in cases:
+            limit = int(name.rsplit("=", 1)[1]) if "limit=" in name else 0
+            total = max(concurrency * 5, requests * 100 // limit) if limit > 100 else requests
+            results[name] = await drive(client, name, make_request, total, concurrency)
+    await engine.dispose()
+    log_file.close()
+    return results
+
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> list[str]:
+    """Endpoints whose requests/second fell or p99 rose by more than max_regression"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+    regressions = []
+    for name, current in results["endpoints"].items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if current["rps"] < before["rps"] * (1 - max_regression):
+            regressions.append(f"{name}: {before['rps']} -> {current['rps']} req/s")
+        if current["p99_us"] > before["p99_us"] * (1 + max_regression):
+            regressions.append(f"{name}: p99 {before['p99_us']} -> {current['p99_us']} us")
+    return regressions
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args, tmp: str, url: str) -> int:
+    page_sizes = [int(size) for size in args.page_sizes.split(",")]
+    endpoints = asyncio.run(bench_suite(
+        url, args.rows, args.requests, args.concurrency, page_sizes, not args.no_cache,
+        os.path.join(tmp, "app.log"),
+    ))
+    dump_path = Path(tmp) / "test_db"
+    dump_path.mkdir()
+    write_test_db(dump_path, args.import_rows)
+    importer = bench_importer(dump_path, url)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": url.split("://", 1)[0],
+            "rows": args.rows,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cache": not args.no_cache,
+            "import_rows": args.import_rows,
+        },
+        "endpoints": endpoints,
+        "importer": importer,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    suite = sub.add_parser("suite", help="API load test and importer rates, reported as JSON")
+    suite.add_argument("--url", default=None, help="Async database URL (default: temporary SQLite file)")
+    suite.add_argument("--rows", type=int, default=10_000, help="Employees to seed")
+    suite.add_argument("--requests", type=int, default=2_000, help="Requests per endpoint (scaled down for pages over 100)")
+    suite.add_argument("--concurrency", type=int, default=16)
+    suite.add_argument("--page-sizes", default="10,100,1000")
+    suite.add_argument("--no-cache", action="store_true", help="Bypass the response cache")
+    suite.add_argument("--import-rows", type=int, default=50_000, help="Employees in the synthetic test_db dump")
+    suite.add_argument("--output", default=None, help="Write results JSON here (default: stdout)")
+    suite.add_argument("--compare", default=None, help="Earlier results JSON to check for regressions")
+    suite.add_argument("--max-regression", type=float, default=0.10, help="Tolerated fractional loss (default 0.10)")
+
+    read_path = sub.add_parser("read-path", help="ORM session vs Core autocommit read per request")
+    read_path.add_argument("--url", default=None, help="Async database URL (default: temporary SQLite file)")
+    read_path.add_argument("--rows", type=int, default=10_000)
+    read_path.add_argument("--requests", type=int, default=5_000)
+
+    serialization = sub.add_parser("serialization", help="response_model vs orjson for employee pages")
+    serialization.add_argument("--url", default=None, help="Async database URL (default: temporary SQLite file)")
+    serialization.add_argument("--rows", type=int, default=10_000)
+    serialization.add_argument("--page-sizes", default="100,1000,10000")
+    serialization.add_argument("--requests", type=int, default=200, help="Requests per run at limit=100 (scaled down for larger pages)")
+
+    debug_logging = sub.add_parser("debug-logging", help="list throughput with request debug sampling off and on")
+    debug_logging.add_argument("--url", default=None, help="Async database URL (default: temporary SQLite file)")
+    debug_logging.add_argument("--rows", type=int, default=10_000)
+    debug_logging.add_argument("--limit", type=int, default=100)
+    debug_logging.add_argument("--requests", type=int, default=2_000)
+
+    metrics = sub.add_parser("metrics", help="MetricsMiddleware per-request overhead")
+    metrics.add_argument("--requests", type=int, default=50_000)
+
+    login = sub.add_parser("login", help="login latency under concurrent attempts, cache off and on")
+    login.add_argument("--url", default=None, help="Async database URL (default: temporary SQLite file)")
+    login.add_argument("--requests", type=int, default=400)
+    login.add_argument("--concurrency", type=int, default=32)
+    login.add_argument("--rounds", type=int, default=settings.bcrypt_rounds, help="bcrypt work factor")
+
+    compression = sub.add_parser("compression", help="bytes saved vs CPU per page size and encoding")
+    compression.add_argument("--url", default=None, help="Async database URL (default: temporary SQLite file)")
+    compression.add_argument("--rows", type=int, default=10_000)
+    compression.add_argument("--page-sizes", default="100,1000,10000")
+    compression.add_argument("--requests", type=int, default=200, help="Runs at limit=100 (scaled down for larger pages)")
+
+    tokens = sub.add_parser("tokens", help="access token validation cost and SQL per authenticated request")
+    tokens.add_argument("--url", default=None, help="Async database URL (default: temporary SQLite file)")
+    tokens.add_argument("--rows", type=int, default=10_000)
+    tokens.add_argument("--requests", type=int, default=20_000)
+
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        url = getattr(args, "url", None) or f"sqlite+aiosqlite:///{tmp}/benchmark.db"
+        if args.command == "suite":
+            sys.exit(run_suite(args, tmp, url))
+        elif args.command == "read-path":
+            asyncio.run(bench_read_path(url, args.rows, args.requests))
+        elif args.command == "serialization":
+            page_sizes = [int(size) for size in args.page_sizes.split(",")]
+            asyncio.run(bench_serialization(url, args.rows, page_sizes, args.requests))
+        elif args.command == "debug-logging":
+            log_path = os.path.join(tmp, "request_debug.log")
+            asyncio.run(bench_debug_logging(url, args.rows, args.limit, args.requests, log_path))
+        elif args.command == "metrics":
+            asyncio.run(bench_metrics(args.requests))
+        elif args.command == "login":
+            asyncio.run(bench_login(url, args.requests, args.concurrency, args.rounds))
+        elif args.command == "compression":
+            page_sizes = [int(size) for size in args.page_sizes.split(",")]
+            asyncio.run(bench_compression(url, args.rows, page_sizes, args.requests))
+        elif args.command == "tokens":
+            asyncio.run(bench_tokens(url, args.rows, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,88 +10,132 @@ Usage:
 This script performs a pragmatic import: it maps `emp_no` -> `employee_id`, builds an email,
 and picks the employee's current department and latest title when available.
 
+Employee rows are streamed into a temporary staging table with `COPY ... FROM STDIN` and then
+merged into `employees` with `ON CONFLICT (employee_id) DO NOTHING`, all in one transaction.
+Pass `--benchmark` to print rows/second for each phase, and `--workers N` to parse the dumps in
+N processes (byte ranges of the large files are parsed concurrently and the COPY starts as soon as
+the first employee range is ready; the result is identical to the serial path).
+
+Employees are committed in segments of `--commit-rows`, and after each commit the byte offset and
+statement index reached in load_employees.dump are written to a state file (`--state-file`,
+default `<path>/.import_state.json`). `--resume` continues from that checkpoint. `--incremental`
+skips the import when no source file's SHA-256 changed since the last complete run, and otherwise
+only rewrites employees whose stored values differ.
+
+The dept_emp/titles lookups are held in CodeMap (one 2-byte slot per emp_no pointing into a small
+table of distinct values) rather than dicts of strings, and employee ranges are parsed in bounded
+windows, so peak memory does not grow with history rows. Peak RSS is printed with the summary.
+
 It is written to be tolerant for this dataset and focuses on populating the `employees` table
 in your existing application database schema.
 """
 import argparse
+import hashlib
+import json
 import os
 import re
+import sys
+import time
 import psycopg2
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# One token of a VALUES list: a quoted string (with MySQL backslash or doubled-quote
+# escapes), a parenthesis, or a bare word such as a number or NULL. Commas and
+# whitespace between tokens are skipped by finditer.
+_TOKEN_RE = re.compile(r"'([^'\\]*(?:(?:\\.|'')[^'\\]*)*)'|([()])|([^\s,()']+)", re.S)
+_ESCAPE_RE = re.compile(r"\\(.)|''", re.S)
+_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+_VALUES_RE = re.compile(r"\bVALUES\b", re.I)
+
+
+def _unescape(match):
+    ch = match.group(1)
+    if ch is None:
+        return "'"
+    return _ESCAPES.get(ch, ch)
+
 
 def iter_tuples_from_insert(stmt_text: str):
-    """Yield lists of raw SQL tokens for each tuple in an INSERT ... VALUES (...) statement."""
-    # find the VALUES (...) part
-    m = re.search(r"VALUES\s*(\(.*\))\s*;?\s*$", stmt_text, flags=re.S | re.I)
+    """Yield lists of values for each tuple in an INSERT ... VALUES (...) statement.
+
+    Single pass over the statement with a compiled regex: NULL becomes None, quoted strings are
+    unescaped, and bare tokens (numbers, dates without quotes) are returned as strings.
+    """
+    m = _VALUES_RE.search(stmt_text)
     if not m:
         return
-    vals = m.group(1)
-    # remove leading/trailing parentheses that wrap all rows
-    if vals.startswith('(') and vals.endswith(')'):
-        inner = vals[1:-1]
-    else:
-        inner = vals
-
-    # split by '),(' but keep quoted strings safe
-    tuples = re.split(r"\),\s*\(", inner)
-    for t in tuples:
-        # restore balanced parentheses removed by split
-        # parse items while respecting quotes
-        parts = []
-        cur = ''
-        in_quote = False
-        i = 0
-        while i < len(t):
-            ch = t[i]
-            if ch == "'":
-                # handle escaped quote by looking ahead/back
-                if i > 0 and t[i-1] == "\\":
-                    cur += ch
-                else:
-                    in_quote = not in_quote
-                    cur += ch
-            elif ch == ',' and not in_quote:
-                parts.append(cur.strip())
-                cur = ''
-            else:
-                cur += ch
-            i += 1
-        if cur:
-            parts.append(cur.strip())
-
-        # normalize parts: NULL -> None, quoted strings -> unescaped
-        norm = []
-        for p in parts:
-            if p == 'NULL':
-                norm.append(None)
-            elif len(p) >= 2 and p[0] == "'" and p[-1] == "'":
-                s = p[1:-1].replace("\\'", "'")
-                norm.append(s)
-            else:
-                norm.append(p)
-        yield norm
-
-
-def stream_inserts_from_file(path):
-    """Yield full INSERT statements from a dump file (handles multi-line statements)."""
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        buffer = ''
-        for line in f:
-            if line.lstrip().upper().startswith('INSERT INTO') and buffer:
-                # previous buffer may be incomplete; yield it first if ended with ;
-                if buffer.strip().endswith(';'):
-                    yield buffer
-                    buffer = line
-                else:
-                    buffer += line
-            else:
-                buffer += line
-            if buffer.strip().endswith(';'):
-                yield buffer
-                buffer = ''
-        if buffer.strip():
-            yield buffer
+    row = None
+    for quoted, paren, bare in _TOKEN_RE.findall(stmt_text, m.end()):
+        if paren == '(':
+            row = []
+        elif paren == ')':
+            if row is not None:
+                yield row
+            row = None
+        elif row is None:
+            continue
+        elif bare:
+            row.append(None if bare == 'NULL' else bare)
+        else:
+            row.append(_ESCAPE_RE.sub(_unescape, quoted) if ('\\' in quoted or "''" in quoted) else quoted)
+
+
+def stream_inserts_from_file(path, start=0, end=None):
+    """Yield full INSERT statements from a dump file (handles multi-line statements).
+
+    `start`/`end` restrict reading to a byte range produced by split_statement_ranges.
+    """
+    for _, stmt in iter_statements(path, start, end):
+        yield stmt
+
+
+def iter_statements(path, start=0, end=None):
+    """Yield (byte offset just past the statement, statement text) from a dump file."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        pos = start
+        buffer = []
+        while end is None or pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            buffer.append(line.decode('utf-8', errors='ignore'))
+            if line.rstrip().endswith(b';'):
+                yield pos, ''.join(buffer)
+                buffer = []
+        if buffer and ''.join(buffer).strip():
+            yield pos, ''.join(buffer)
+
+
+def split_statement_ranges(path, parts, start=0):
+    """Split a dump (from `start`) into at most `parts` byte ranges that each start and end on a statement boundary."""
+    size = os.path.getsize(path)
+    bounds = [start]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            target = max(start + (size - start) * i // parts, bounds[-1])
+            f.seek(target)
+            if target:
+                f.readline()  # skip the partial line we landed in
+            while True:
+                line = f.readline()
+                if not line or line.rstrip().endswith(b';'):
+                    break
+            boundary = f.tell()
+            if bounds[-1] < boundary < size:
+                bounds.append(boundary)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
 
 
 def parse_departments(path):
@@ -107,69 +151,194 @@ def parse_departments(path):
     return mapping
 
 
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
 def build_latest_map_from_dump(path, key_index=0, value_index=1, to_date_index=None):
     """Return dict key->value selecting the row with to_date='9999-01-01' or latest from_date.
 
-    Used for dept_emp (emp_no->dept_no) and titles (emp_no->title).
+    Used for dept_emp (emp_no->dept_no) and titles (emp_no->title). Only the best row seen so far
+    is kept per key, so memory grows with distinct keys rather than with history rows.
     """
-    from collections import defaultdict
-    records = defaultdict(list)
+    best = {}  # key -> (is_current, latest date, parts)
     for stmt in stream_inserts_from_file(path):
         for parts in iter_tuples_from_insert(stmt):
             try:
                 key = parts[key_index]
-                val = parts[value_index]
                 # from_date at -2 typically, to_date at -1
                 to_date = parts[to_date_index] if to_date_index is not None and to_date_index < len(parts) else None
-                records[key].append((parts, to_date))
             except Exception:
                 continue
+            current = best.get(key)
+            if current is not None and current[0]:
+                continue  # first current row wins
+            if to_date == '9999-01-01':
+                best[key] = (True, None, parts)
+                continue
+            # fallback: the record with the max date-like field (searching from the end)
+            date = next((p for p in reversed(parts) if p and _DATE_RE.match(str(p))), None)
+            if date is not None and (current is None or current[1] is None or date > current[1]):
+                best[key] = (False, date, parts)
+    return {key: parts for key, (_, _, parts) in best.items()}
 
-    result = {}
-    for k, recs in records.items():
-        # prefer to_date == '9999-01-01'
-        chosen = None
-        for parts, to_date in recs:
-            if to_date == '9999-01-01' or to_date == '9999-01-01':
-                chosen = parts
-                break
-        if not chosen:
-            # fallback: choose the record with max from_date (assume index -2)
-            best = None
-            best_date = None
-            for parts, _ in recs:
-                # find a date-like field in parts
-                for p in reversed(parts):
-                    if p and re.match(r"\d{4}-\d{2}-\d{2}", str(p)):
-                        if best_date is None or p > best_date:
-                            best_date = p
-                            best = parts
-                        break
-            chosen = best
-        if chosen:
-            result[k] = chosen
-    return result
 
+class CodeMap:
+    """Compact emp_no -> value map used for the dept_emp/titles joins.
 
-def import_to_postgres(args):
-    # DB connection
-    host = os.environ.get('PGHOST', args.host)
-    port = os.environ.get('PGPORT', args.port)
-    user = os.environ.get('PGUSER', args.user)
-    password = os.environ.get('PGPASSWORD', args.password)
-    dbname = os.environ.get('PGDATABASE', args.database)
-
-    dsn = f"host={host} port={port} dbname={dbname} user={user} password={password}"
-    print(f"Connecting to Postgres: {host}:{port}/{dbname} as {user}")
-    conn = psycopg2.connect(dsn)
-    cur = conn.cursor()
+    Values repeat heavily (a handful of titles and departments), so each distinct value is stored
+    once and every integer key gets a 2-byte slot in an array holding that value's code. That is
+    about 2 bytes per employee instead of a dict entry plus two strings. Keys that are not plain
+    integers, or are implausibly large, go to a small dict instead.
+    """
 
-    # parse department names
-    dept_map = parse_departments(os.path.join(args.path, 'load_departments.dump'))
+    MAX_DENSE_KEY = 50_000_000
+
+    def __init__(self):
+        self.values = [None]  # code -> value; code 0 means "no entry"
+        self._codes = {}
+        self.slots = array('H')
+        self.sparse = {}
+        self._count = 0
+
+    def _code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            if code == 0x10000 and self.slots.typecode == 'H':
+                self.slots = array('I', self.slots)
+        return code
+
+    @staticmethod
+    def _dense_key(key):
+        try:
+            k = int(key)
+        except (TypeError, ValueError):
+            return None
+        if 0 <= k < CodeMap.MAX_DENSE_KEY and str(k) == key:
+            return k
+        return None
+
+    def __setitem__(self, key, value):
+        k = self._dense_key(key)
+        if k is None:
+            self._count += key not in self.sparse
+            self.sparse[key] = value
+        else:
+            self._set_dense(k, self._code(value))
+
+    def _set_dense(self, k, code):
+        if k >= len(self.slots):
+            grow = max(k + 1, 2 * len(self.slots)) - len(self.slots)
+            self.slots.frombytes(bytes(grow * self.slots.itemsize))
+        self._count += self.slots[k] == 0
+        self.slots[k] = code
+
+    def get(self, key, default=None):
+        k = self._dense_key(key)
+        if k is None:
+            return self.sparse.get(key, default)
+        code = self.slots[k] if k < len(self.slots) else 0
+        return self.values[code] if code else default
+
+    def update(self, other):
+        """Apply every entry of another CodeMap; its values win, as for dict.update."""
+        translate = [0] + [self._code(value) for value in other.values[1:]]
+        for k, code in enumerate(other.slots):
+            if code:
+                self._set_dense(k, translate[code])
+        for key, value in other.sparse.items():
+            self[key] = value
+
+    def items(self):
+        for k, code in enumerate(self.slots):
+            if code:
+                yield str(k), self.values[code]
+        yield from self.sparse.items()
+
+    def __len__(self):
+        return self._count
+
+
+def peak_rss_mib():
+    """
+    Peak resident memory of this process and of finished worker processes, in MiB,
+    or None where the resource module is unavailable (Windows).
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux but in bytes on macOS
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit
+    return own, children
+
+
+EMPLOYEE_COLUMNS = (
+    'employee_id', 'email', 'first_name', 'last_name', 'department', 'position',
+    'phone', 'address', 'is_active', 'hire_date', 'created_at',
+)
+
+# Staging table for COPY; dropped automatically when the import transaction commits
+STAGING_DDL = """
+CREATE TEMP TABLE employees_import (
+    employee_id varchar(50),
+    email varchar(255),
+    first_name varchar(100),
+    last_name varchar(100),
+    department varchar(100),
+    position varchar(100),
+    phone varchar(20),
+    address text,
+    is_active boolean,
+    hire_date timestamptz,
+    created_at timestamptz
+) ON COMMIT DROP
+"""
 
-    # build latest dept_emp map: emp_no -> dept_no
-    dept_emp_latest = {}
-    for stmt in stream_inserts_from_file(os.path.join(args.path, 'load_dept_emp.dump')):
+MERGE_SQL = (
+    f"INSERT INTO employees ({', '.join(EMPLOYEE_COLUMNS)})"
+    f" SELECT {', '.join(EMPLOYEE_COLUMNS)} FROM employees_import"
+    " ON CONFLICT (employee_id) DO NOTHING"
+)
+
+# Columns derived from the dumps; --incremental rewrites a stored row only if one differs
+SOURCE_COLUMNS = ('email', 'first_name', 'last_name', 'department', 'position', 'hire_date')
+
+UPSERT_CHANGED_SQL = (
+    f"INSERT INTO employees ({', '.join(EMPLOYEE_COLUMNS)})"
+    f" SELECT DISTINCT ON (employee_id) {', '.join(EMPLOYEE_COLUMNS)} FROM employees_import"
+    " ORDER BY employee_id"
+    " ON CONFLICT (employee_id) DO UPDATE SET "
+    + ', '.join(f"{c} = EXCLUDED.{c}" for c in SOURCE_COLUMNS)
+    + ", updated_at = now()"
+    f" WHERE ({', '.join(f'employees.{c}' for c in SOURCE_COLUMNS)})"
+    f" IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in SOURCE_COLUMNS)})"
+)
+
+
+class PhaseStats:
+    """Rows and wall time per import phase, for the --benchmark report."""
+
+    def __init__(self):
+        self.phases = []
+        self.started = time.perf_counter()
+
+    def record(self, name, rows, started):
+        self.phases.append((name, rows, time.perf_counter() - started))
+
+    def report(self):
+        print(f"{'phase':<16}{'rows':>12}{'seconds':>10}{'rows/s':>14}")
+        for name, rows, seconds in self.phases:
+            rate = rows / seconds if seconds > 0 else float('inf')
+            print(f"{name:<16}{rows:>12}{seconds:>10.2f}{rate:>14,.0f}")
+        print(f"{'total':<16}{'':>12}{time.perf_counter() - self.started:>10.2f}")
+
+
+def build_dept_emp_latest(path, start=0, end=None):
+    """Return emp_no -> dept_no for each employee's current department (to_date 9999-01-01)."""
+    dept_emp_latest = CodeMap()
+    for stmt in stream_inserts_from_file(path, start, end):
         for parts in iter_tuples_from_insert(stmt):
             try:
                 emp_no = parts[0]
@@ -180,10 +349,13 @@ def import_to_postgres(args):
                     dept_emp_latest[emp_no] = dept_no
             except Exception:
                 continue
+    return dept_emp_latest
 
-    # build latest title map: emp_no -> title
-    title_latest = {}
-    for stmt in stream_inserts_from_file(os.path.join(args.path, 'load_titles.dump')):
+
+def build_title_latest(path, start=0, end=None):
+    """Return emp_no -> title for each employee's current title."""
+    title_latest = CodeMap()
+    for stmt in stream_inserts_from_file(path, start, end):
         for parts in iter_tuples_from_insert(stmt):
             try:
                 emp_no = parts[0]
@@ -193,55 +365,349 @@ def import_to_postgres(args):
                     title_latest[emp_no] = title
             except Exception:
                 continue
+    return title_latest
+
+
+def employee_row(parts, dept_map, dept_emp_latest, title_latest):
+    """Map one load_employees tuple to a row of EMPLOYEE_COLUMNS."""
+    emp_no = parts[0]
+    # birth_date = parts[1]
+    first_name = parts[2]
+    last_name = parts[3]
+    # gender = parts[4]
+    hire_date = parts[5] if len(parts) > 5 else None
+
+    emp_id = str(emp_no)
+    email = f"{emp_id}@example.local"
+    dept_no = dept_emp_latest.get(emp_no)
+    department = dept_map.get(dept_no) if dept_no else None
+    position = title_latest.get(emp_no)
+    created_at = hire_date if hire_date else datetime.utcnow().isoformat()
+    return (emp_id, email, first_name, last_name, department, position, None, None, True, hire_date, created_at)
+
+
+def iter_employee_batches(path, dept_map, dept_emp_latest, title_latest, start=0):
+    """Yield (end offset, 1, rows) per statement of load_employees.dump, skipping tuples that do not parse."""
+    for offset, stmt in iter_statements(path, start):
+        rows = []
+        for parts in iter_tuples_from_insert(stmt):
+            try:
+                rows.append(employee_row(parts, dept_map, dept_emp_latest, title_latest))
+            except Exception as e:
+                print(f"Skipping row due to parse error: {e}")
+        yield offset, 1, rows
+
+
+def serial_employee_batches(path, stats, start=0):
+    """Build the lookup maps now and return an iterator of employee batches, all in this process.
 
-    # stream employees and insert in batches
-    insert_sql = (
-        "INSERT INTO employees (employee_id, email, first_name, last_name, department, position, phone, address, is_active, hire_date, created_at)"
-        " VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s) ON CONFLICT (employee_id) DO NOTHING"
+    Batches are (byte offset reached, statements consumed, rows) so callers can checkpoint.
+    """
+    started = time.perf_counter()
+    dept_map = parse_departments(os.path.join(path, 'load_departments.dump'))
+    stats.record('departments', len(dept_map), started)
+
+    # build latest dept_emp map: emp_no -> dept_no
+    started = time.perf_counter()
+    dept_emp_latest = build_dept_emp_latest(os.path.join(path, 'load_dept_emp.dump'))
+    stats.record('dept_emp', len(dept_emp_latest), started)
+
+    # build latest title map: emp_no -> title
+    started = time.perf_counter()
+    title_latest = build_title_latest(os.path.join(path, 'load_titles.dump'))
+    stats.record('titles', len(title_latest), started)
+
+    return iter_employee_batches(
+        os.path.join(path, 'load_employees.dump'), dept_map, dept_emp_latest, title_latest, start
+    )
+
+
+def _parse_employee_range(path, start, end):
+    """Worker: (statement count, raw employee tuples) for one byte range; the parent joins lookups."""
+    statements = 0
+    tuples = []
+    for stmt in stream_inserts_from_file(path, start, end):
+        statements += 1
+        tuples.extend(iter_tuples_from_insert(stmt))
+    return statements, tuples
+
+
+def _merge_in_order(futures):
+    """Combine per-range maps in file order so later rows win, exactly as in a serial scan."""
+    merged = CodeMap()
+    for future in futures:
+        merged.update(future.result())
+    return merged
+
+
+# Target size of the load_employees.dump ranges handed to --workers processes
+EMPLOYEE_RANGE_BYTES = 4 << 20
+
+
+def parallel_employee_batches(path, workers, stats, start=0):
+    """Yield the same rows as serial_employee_batches, parsing byte ranges in a process pool.
+
+    Lookup ranges are submitted first so the maps are ready early; employee ranges parse
+    alongside them and are consumed in order, so COPY streams while later ranges still parse.
+    Each batch covers one employee range.
+    """
+    started = time.perf_counter()
+    dept_emp_path = os.path.join(path, 'load_dept_emp.dump')
+    titles_path = os.path.join(path, 'load_titles.dump')
+    employees_path = os.path.join(path, 'load_employees.dump')
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        departments = pool.submit(parse_departments, os.path.join(path, 'load_departments.dump'))
+        dept_emp = [
+            pool.submit(build_dept_emp_latest, dept_emp_path, a, b)
+            for a, b in split_statement_ranges(dept_emp_path, workers)
+        ]
+        titles = [
+            pool.submit(build_title_latest, titles_path, a, b)
+            for a, b in split_statement_ranges(titles_path, workers)
+        ]
+        # Many small employee ranges with a bounded window in flight, so parsed-but-unconsumed
+        # tuples never amount to more than a few ranges regardless of file size
+        size = os.path.getsize(employees_path) - start
+        ranges = iter(split_statement_ranges(employees_path, max(workers, -(-size // EMPLOYEE_RANGE_BYTES)), start))
+        employees = deque()
+
+        def submit_next():
+            for a, b in ranges:
+                employees.append((b, pool.submit(_parse_employee_range, employees_path, a, b)))
+                return
+
+        for _ in range(2 * workers):
+            submit_next()
+
+        dept_map = departments.result()
+        dept_emp_latest = _merge_in_order(dept_emp)
+        title_latest = _merge_in_order(titles)
+        stats.record('lookups', len(dept_map) + len(dept_emp_latest) + len(title_latest), started)
+
+        while employees:
+            end, future = employees.popleft()
+            statements, tuples = future.result()
+            submit_next()
+            rows = []
+            for parts in tuples:
+                try:
+                    rows.append(employee_row(parts, dept_map, dept_emp_latest, title_latest))
+                except Exception as e:
+                    print(f"Skipping row due to parse error: {e}")
+            yield end, statements, rows
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def iter_segments(batches, commit_rows):
+    """Group batches into (end offset, statements, rows) segments of at least `commit_rows` rows."""
+    rows = []
+    statements = 0
+    offset = None
+    for offset, count, batch_rows in batches:
+        rows.extend(batch_rows)
+        statements += count
+        if len(rows) >= commit_rows:
+            yield offset, statements, rows
+            rows = []
+            statements = 0
+    if statements:
+        yield offset, statements, rows
+
+
+def file_sha256(path):
+    """Hex SHA-256 of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    """Cheap identity of a file, used to check a checkpoint still applies."""
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def load_state(path):
+    """Read the import state file ({} if it does not exist)."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(path, state):
+    """Write the import state file atomically."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_line(row):
+    """Encode a row as one line of COPY text format."""
+    fields = []
+    for value in row:
+        if value is None:
+            fields.append('\\N')
+        elif value is True:
+            fields.append('t')
+        elif value is False:
+            fields.append('f')
+        else:
+            fields.append(str(value).translate(_COPY_ESCAPES))
+    return '\t'.join(fields) + '\n'
+
+
+class CopyStream:
+    """File-like object that renders rows to COPY text lazily as psycopg2 reads it."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._pending = ''
+        self.count = 0
+
+    def read(self, size=-1):
+        parts = [self._pending]
+        total = len(self._pending)
+        while size < 0 or total < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = copy_line(row)
+            parts.append(line)
+            total += len(line)
+            self.count += 1
+        data = ''.join(parts)
+        if 0 <= size < len(data):
+            self._pending = data[size:]
+            return data[:size]
+        self._pending = ''
+        return data
+
+
+def copy_employees(cur, rows):
+    """COPY rows into a fresh staging table and return how many were sent."""
+    cur.execute(STAGING_DDL)
+    stream = CopyStream(rows)
+    cur.copy_expert(
+        f"COPY employees_import ({', '.join(EMPLOYEE_COLUMNS)}) FROM STDIN",
+        stream,
+        size=1 << 16,
     )
+    return stream.count
+
+
+SOURCE_FILES = ('load_departments.dump', 'load_dept_emp.dump', 'load_titles.dump', 'load_employees.dump')
 
-    batch = []
-    batch_size = 1000
+
+def import_to_postgres(args):
+    state_file = args.state_file or os.path.join(args.path, '.import_state.json')
+    state = load_state(state_file)
+    employees_path = os.path.join(args.path, 'load_employees.dump')
+
+    hashes = None
+    if args.incremental:
+        hashes = {name: file_sha256(os.path.join(args.path, name)) for name in SOURCE_FILES}
+        changed = [name for name in SOURCE_FILES if state.get('hashes', {}).get(name) != hashes[name]]
+        if not changed and 'checkpoint' not in state:
+            print("No source files changed since the last import; nothing to do.")
+            return
+        print(f"Changed since last import: {', '.join(changed) or 'none (finishing checkpoint)'}")
+
+    start = 0
+    statement_index = 0
     total = 0
-    for stmt in stream_inserts_from_file(os.path.join(args.path, 'load_employees.dump')):
-        for parts in iter_tuples_from_insert(stmt):
-            try:
-                emp_no = parts[0]
-                birth_date = parts[1]
-                first_name = parts[2]
-                last_name = parts[3]
-                # gender = parts[4]
-                hire_date = parts[5] if len(parts) > 5 else None
-
-                emp_id = str(emp_no)
-                email = f"{emp_id}@example.local"
-                dept_no = dept_emp_latest.get(emp_no)
-                department = dept_map.get(dept_no) if dept_no else None
-                position = title_latest.get(emp_no)
-                phone = None
-                address = None
-                is_active = True
-                created_at = hire_date if hire_date else datetime.utcnow().isoformat()
-
-                batch.append((emp_id, email, first_name, last_name, department, position, phone, address, is_active, hire_date, created_at))
-                if len(batch) >= batch_size:
-                    cur.executemany(insert_sql, batch)
-                    conn.commit()
-                    total += len(batch)
-                    print(f"Inserted {total} employees...")
-                    batch = []
-            except Exception as e:
-                print(f"Skipping row due to parse/insert error: {e}")
-                continue
+    checkpoint = state.get('checkpoint')
+    if args.resume and checkpoint:
+        if checkpoint.get('fingerprint') == file_fingerprint(employees_path):
+            start = checkpoint['offset']
+            statement_index = checkpoint['statement_index']
+            total = checkpoint['rows']
+            print(f"Resuming at statement {statement_index} (byte {start}, {total} rows already committed)")
+        else:
+            print("load_employees.dump changed since the checkpoint; starting from the beginning")
+    elif args.resume:
+        print("No checkpoint found; starting from the beginning")
 
-    if batch:
-        cur.executemany(insert_sql, batch)
-        conn.commit()
-        total += len(batch)
+    # DB connection
+    host = os.environ.get('PGHOST', args.host)
+    port = os.environ.get('PGPORT', args.port)
+    user = os.environ.get('PGUSER', args.user)
+    password = os.environ.get('PGPASSWORD', args.password)
+    dbname = os.environ.get('PGDATABASE', args.database)
 
-    cur.close()
-    conn.close()
-    print(f"Import complete. Total inserted (approx): {total}")
+    dsn = f"host={host} port={port} dbname={dbname} user={user} password={password}"
+    print(f"Connecting to Postgres: {host}:{port}/{dbname} as {user}")
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    stats = PhaseStats()
+    merge_sql = UPSERT_CHANGED_SQL if args.incremental else MERGE_SQL
+
+    if args.workers > 1:
+        batches = parallel_employee_batches(args.path, args.workers, stats, start)
+    else:
+        batches = serial_employee_batches(args.path, stats, start)
+
+    # stream each segment into the staging table, merge, commit, then checkpoint
+    copied = 0
+    written = 0
+    copy_seconds = 0.0
+    merge_seconds = 0.0
+    try:
+        for offset, statements, rows in iter_segments(batches, args.commit_rows):
+            started = time.perf_counter()
+            copied += copy_employees(cur, rows)
+            copy_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            cur.execute(merge_sql)
+            written += cur.rowcount
+            conn.commit()
+            merge_seconds += time.perf_counter() - started
+
+            statement_index += statements
+            total += len(rows)
+            state['checkpoint'] = {
+                'file': 'load_employees.dump',
+                'fingerprint': file_fingerprint(employees_path),
+                'offset': offset,
+                'statement_index': statement_index,
+                'rows': total,
+            }
+            save_state(state_file, state)
+            print(f"Committed {total} employees (statement {statement_index})...")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    stats.phases.append(('employees_copy', copied, copy_seconds))
+    stats.phases.append(('merge', copied, merge_seconds))
+
+    state.pop('checkpoint', None)
+    state['hashes'] = hashes or {name: file_sha256(os.path.join(args.path, name)) for name in SOURCE_FILES}
+    save_state(state_file, state)
+
+    action = 'inserted or updated' if args.incremental else 'inserted'
+    print(f"Import complete. Parsed {copied} employees, {action} {written} rows.")
+    rss = peak_rss_mib()
+    if rss:
+        own, children = rss
+        print(f"Peak RSS: {own:.0f} MiB" + (f" (largest worker: {children:.0f} MiB)" if children else ""))
+    if args.benchmark:
+        stats.report()
+    return stats
 
 
 def main():
@@ -252,6 +718,13 @@ def main():
     parser.add_argument('--user', default='postgres')
     parser.add_argument('--password', default='')
     parser.add_argument('--database', default='hrdb')
+    parser.add_argument('--benchmark', action='store_true', help='Report rows/second for each import phase')
+    parser.add_argument('--workers', type=int, default=1, help='Parse dumps in N processes (1 = serial)')
+    parser.add_argument('--commit-rows', type=int, default=50_000, help='Employees per committed, checkpointed segment')
+    parser.add_argument('--state-file', default=None, help='Checkpoint/hash state file (default: <path>/.import_state.json)')
+    parser.add_argument('--resume', action='store_true', help='Continue from the last committed checkpoint')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip if no source file changed; otherwise only update employees whose values differ')
     args = parser.parse_args()
 
     if not os.path.isdir(args.path):
@@ -0,0 +1,586 @@
+"""
+Response cache for read-heavy endpoints with pluggable storage backends
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import json
+import logging
+import time
+
+from pydantic import BaseModel
+
+from src.config import settings
+from src.responses import json_default
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(route: str, **params: Any) -> str:
+    """Build a cache key from a route name and its query parameters"""
+    args = "&".join(f"{k}={params[k]}" for k in sorted(params) if params[k] is not None)
+    return f"{route}?{args}"
+
+
+class CacheBackend:
+    """
+    Storage interface for ResponseCache.
+
+    `generation` changes whenever the backend is invalidated, including by
+    another process, so callers can tell whether a load raced a write.
+    """
+
+    generation: int = 0
+
+    async def start(self) -> None:
+        """Open connections or background tasks"""
+
+    async def close(self) -> None:
+        """Release connections or background tasks"""
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    async def invalidate(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Rough in-memory size of a cached value in bytes.
+
+    Lists are estimated from a sample of their first items, so sizing a
+    10,000-row page costs a handful of item walks rather than a full one.
+    """
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return 64
+        sample = value[:8]
+        return 64 + 8 * len(value) + sum(estimate_size(item) for item in sample) * len(value) // len(sample)
+    if isinstance(value, dict):
+        return 240 + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (str, bytes)):
+        return 49 + len(value)
+    if isinstance(value, BaseModel):
+        return estimate_size(value.__dict__)
+    return 32
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Bounded LRU cache in this process whose entries also expire after a TTL.
+
+    Bounded both by entry count and by the estimated size of the cached
+    values (see estimate_size), so a few huge pages cannot grow the task
+    without limit; a value larger than a quarter of `max_bytes` is not
+    stored at all.
+
+    All bookkeeping happens synchronously between awaits, so it is safe to
+    share across coroutines on one event loop without a lock.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, max_bytes: int = 256 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+
+    def _drop(self, key: str) -> None:
+        self.size -= self._entries.pop(key)[2]
+        self.evictions += 1
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    async def set(self, key: str, value: Any) -> None:
+        size = estimate_size(value)
+        if key in self._entries:
+            self.size -= self._entries.pop(key)[2]
+        if size > self.max_bytes // 4:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value, size)
+        self.size += size
+        while len(self._entries) > self.maxsize or self.size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    async def invalidate(self) -> None:
+        self._entries.clear()
+        self.size = 0
+        self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.maxsize,
+            "estimated_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "evictions": self.evictions,
+        }
+
+
+class RedisError(Exception):
+    """Error reply or protocol failure from a Redis server"""
+
+
+class RedisConnection:
+    """
+    Minimal asyncio client for the Redis protocol (RESP2).
+
+    Commands are serialized on the connection. If a round trip is abandoned
+    part-way for any reason - a timeout, a network error or the caller being
+    cancelled - the connection is closed, because the unread reply would
+    otherwise be returned to the next command.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", self.db)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def execute(self, *args: Any) -> Any:
+        """Send a command and return its decoded reply, reconnecting if needed"""
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await self.connect()
+                return await asyncio.wait_for(self._roundtrip(*args), self.timeout)
+            except RedisError:
+                # An error reply was read in full; the stream is still in sync
+                raise
+            except BaseException:
+                self._abort()
+                raise
+
+    def _abort(self) -> None:
+        """Drop the connection without waiting, safe to call while being cancelled"""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def send(self, *args: Any) -> None:
+        """Write a command without waiting for its reply (used by subscribers)"""
+        if self._writer is None:
+            await self.connect()
+        self._writer.write(self._encode(args))
+        await self._writer.drain()
+
+    async def _roundtrip(self, *args: Any) -> Any:
+        await self.send(*args)
+        return await self.read_reply()
+
+    @staticmethod
+    def _encode(args: Tuple[Any, ...]) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    async def read_reply(self) -> Any:
+        line = await self._reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count == -1:
+                return None
+            return [await self.read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+
+class RedisUnavailable(ConnectionError):
+    """Raised without contacting Redis while the pool is marked down"""
+
+
+class RedisPool:
+    """
+    A few RedisConnections shared by the cache, so lookups from concurrent
+    requests do not queue behind one socket. A connection is returned to the
+    pool only after a complete round trip; one interrupted mid-command has
+    already closed itself and is replaced on next use.
+
+    A connection failure or timeout marks the pool down for `retry_seconds`,
+    like ReplicaRouter.mark_down: commands fail at once with RedisUnavailable
+    instead of each waiting out the timeout against an unreachable server.
+    """
+
+    def __init__(self, url: str, size: int = 8, timeout: float = 1.0, retry_seconds: float = 5.0):
+        self.url = url
+        self.size = size
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.down_until = 0.0
+        self.last_error: Optional[str] = None
+        self._idle: List[RedisConnection] = []
+        self._slots = asyncio.Semaphore(size)
+
+    def healthy(self, now: Optional[float] = None) -> bool:
+        return (time.monotonic() if now is None else now) >= self.down_until
+
+    def mark_down(self, error: BaseException) -> None:
+        if self.healthy():
+            logger.warning(f"Redis cache unavailable, skipping it for {self.retry_seconds}s: {error}")
+        self.down_until = time.monotonic() + self.retry_seconds
+        self.last_error = str(error)
+
+    def mark_up(self) -> None:
+        self.down_until = 0.0
+        self.last_error = None
+
+    async def execute(self, *args: Any, force: bool = False) -> Any:
+        """
+        Run one command. `force` tries Redis even while the pool is marked
+        down, for commands that must not be skipped.
+        """
+        if not force and not self.healthy():
+            raise RedisUnavailable(self.last_error or "Redis marked down")
+        async with self._slots:
+            # Requests queued behind the failing one fail fast as well
+            if not force and not self.healthy():
+                raise RedisUnavailable(self.last_error or "Redis marked down")
+            conn = self._idle.pop() if self._idle else RedisConnection(self.url, self.timeout)
+            try:
+                result = await conn.execute(*args)
+            except (ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                self.mark_down(e)
+                raise
+            finally:
+                if conn._writer is not None:
+                    self._idle.append(conn)
+            if force:
+                self.mark_up()
+            return result
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await conn.close()
+
+
+def _json_default(value: Any) -> Any:
+    # Dates are stored exactly as responses encode them (UTC as "Z"), so a
+    # value read back from Redis renders the same bytes as a fresh load
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    try:
+        return json_default(value)
+    except TypeError:
+        raise TypeError(f"Cannot cache {type(value).__name__}")
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared by every API task through Redis.
+
+    Entries live under `<prefix>:<generation>:<key>` and expire server-side.
+    Invalidation INCRs the shared generation and PUBLISHes it, so every task
+    moves to the new namespace at once; old entries simply age out. Values are
+    stored as JSON and response models re-validate them on the way out.
+    Redis failures degrade to cache misses rather than failed requests, and
+    after one the cache skips Redis for `retry_seconds` so the misses are
+    fast; invalidation still goes to Redis so other tasks hear of writes.
+    """
+
+    def __init__(self, url: str, ttl: float = 30.0, prefix: str = "hrcache", timeout: float = 1.0,
+                 pool_size: int = 8, retry_seconds: float = 5.0):
+        self.url = url
+        self.ttl = ttl
+        self.prefix = prefix
+        self.generation = 0
+        self.errors = 0
+        self.skipped = 0
+        self._conn = RedisPool(url, pool_size, timeout, retry_seconds)
+        self._subscriber: Optional[asyncio.Task] = None
+
+    @property
+    def _generation_key(self) -> str:
+        return f"{self.prefix}:generation"
+
+    @property
+    def _channel(self) -> str:
+        return f"{self.prefix}:invalidate"
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{self.generation}:{key}"
+
+    def _observe(self, generation: Any) -> None:
+        if generation is not None:
+            self.generation = max(self.generation, int(generation))
+
+    async def start(self) -> None:
+        try:
+            self._observe(await self._conn.execute("GET", self._generation_key))
+        except (RedisError, ConnectionError, OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"Redis cache unavailable at startup: {e}")
+        self._subscriber = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            try:
+                await self._subscriber
+            except asyncio.CancelledError:
+                pass
+            self._subscriber = None
+        await self._conn.close()
+
+    async def _listen(self) -> None:
+        """Follow generation bumps published by other tasks, reconnecting on failure"""
+        delay = 0.5
+        while True:
+            conn = RedisConnection(self.url)
+            try:
+                await conn.send("SUBSCRIBE", self._channel)
+                await conn.read_reply()
+                # Redis is reachable again, so stop skipping it
+                self._conn.mark_up()
+                # Catch up on anything published while we were disconnected
+                self._observe(await self._conn.execute("GET", self._generation_key))
+                delay = 0.5
+                while True:
+                    message = await conn.read_reply()
+                    if isinstance(message, list) and len(message) == 3 and message[0] == b"message":
+                        self._observe(message[2])
+            except asyncio.CancelledError:
+                await conn.close()
+                raise
+            except (RedisError, ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                await conn.close()
+                # On 3.11 wait_for can report a connect failure in place of a
+                # cancellation that arrived at the same moment; honour it
+                if asyncio.current_task().cancelling():
+                    raise asyncio.CancelledError
+                logger.warning(f"Redis cache subscription lost: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        try:
+            data = await self._conn.execute("GET", self._key(key))
+        except RedisUnavailable:
+            self.skipped += 1
+            return False, None
+        except (RedisError, ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            self.errors += 1
+            logger.warning(f"Redis cache GET failed: {e}")
+            return False, None
+        if data is None:
+            return False, None
+        return True, json.loads(data)
+
+    async def set(self, key: str, value: Any) -> None:
+        data = json.dumps(value, default=_json_default)
+        try:
+            await self._conn.execute("SET", self._key(key), data, "PX", int(self.ttl * 1000))
+        except RedisUnavailable:
+            self.skipped += 1
+        except (RedisError, ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            self.errors += 1
+            logger.warning(f"Redis cache SET failed: {e}")
+
+    async def invalidate(self) -> None:
+        # Bump locally first so this task never serves pre-write data, even if Redis is down
+        self.generation += 1
+        try:
+            generation = await self._conn.execute("INCR", self._generation_key, force=True)
+            self._observe(generation)
+            await self._conn.execute("PUBLISH", self._channel, self.generation, force=True)
+        except (RedisError, ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            self.errors += 1
+            logger.error(f"Redis cache invalidation failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl,
+            "generation": self.generation,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "healthy": self._conn.healthy(),
+            "retry_in_seconds": round(max(self._conn.down_until - time.monotonic(), 0.0), 1),
+            "last_error": self._conn.last_error,
+        }
+
+
+class ResponseCache:
+    """
+    Read-through cache in front of a CacheBackend.
+
+    Concurrent misses for the same key are coalesced in-process: the first
+    caller runs the loader and the others await its result, so a cold cache
+    issues one query per key instead of one per request. Loads that overlap
+    an invalidation are returned but not stored.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def start(self) -> None:
+        await self.backend.start()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, calling loader once on a miss"""
+        pending = self._inflight.get(key)
+        if pending is None:
+            found, value = await self.backend.get(key)
+            if found:
+                self.hits += 1
+                return value
+            pending = self._inflight.get(key)
+
+        self.misses += 1
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The leading request was cancelled (e.g. client disconnected)
+                if not pending.cancelled():
+                    raise
+                return await loader()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self.backend.generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a miss with no waiters does not log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if generation == self.backend.generation:
+                await self.backend.set(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def invalidate(self) -> None:
+        """Drop every entry, in every process sharing the backend; called after writes"""
+        self._inflight.clear()
+        await self.backend.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class NullCache(ResponseCache):
+    """Cache that always loads; used when caching is disabled"""
+
+    def __init__(self):
+        super().__init__(CacheBackend())
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        self.misses += 1
+        return await loader()
+
+    async def invalidate(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "disabled", **super().stats()}
+
+
+def create_cache() -> ResponseCache:
+    """Build the response cache selected by settings"""
+    if not settings.cache_enabled:
+        return NullCache()
+    if settings.cache_backend == "redis":
+        if not settings.cache_redis_url:
+            raise RuntimeError("cache_backend is 'redis' but cache_redis_url is not set")
+        backend = RedisCacheBackend(
+            settings.cache_redis_url,
+            ttl=settings.cache_ttl_seconds,
+            prefix=settings.cache_key_prefix,
+            pool_size=settings.cache_redis_pool_size,
+            retry_seconds=settings.cache_redis_retry_seconds,
+        )
+    elif settings.cache_backend == "memory":
+        backend = MemoryCacheBackend(
+            maxsize=settings.cache_max_entries,
+            ttl=settings.cache_ttl_seconds,
+            max_bytes=settings.cache_max_mb * 1024 * 1024,
+        )
+    else:
+        raise RuntimeError(f"Unknown cache_backend: {settings.cache_backend!r}")
+    return ResponseCache(backend)
+
+
+# Shared cache for employee and stats reads
+response_cache = create_cache()
@@ -0,0 +1,167 @@
+"""
+Response compression.
+
+gzip is always available; brotli ("br") and zstandard ("zstd") are used
+when the `brotli` / `zstandard` packages are installed. The encoding is
+chosen from the client's Accept-Encoding in the server's preference order
+(`compression_encodings`). Only complete, buffered bodies of compressible
+types over `compression_min_size` are compressed; streamed responses (the
+CSV/NDJSON export) and bodies that already carry a Content-Encoding pass
+through untouched. Bodies over `compression_thread_min_size` are compressed
+in a small thread pool - zlib, brotli and zstd release the GIL - so a
+10,000-row page does not stall the event loop.
+"""
+import asyncio
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics import Counter, registry
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson", "application/javascript", "application/xml")
+
+compression_input_bytes = registry.register(Counter(
+    "http_compression_input_bytes_total", "Response bytes before compression", ("encoding",),
+))
+compression_output_bytes = registry.register(Counter(
+    "http_compression_output_bytes_total", "Response bytes after compression", ("encoding",),
+))
+
+
+def _zstd(body: bytes, level: int) -> bytes:
+    # ZstdCompressor instances must not be shared between threads
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+def encoders(gzip_level: int, brotli_quality: int, zstd_level: int) -> Dict[str, Callable[[bytes], bytes]]:
+    """Compress functions for the encodings available in this environment"""
+    available = {"gzip": lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        available["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+    if zstandard is not None:
+        available["zstd"] = lambda body: _zstd(body, zstd_level)
+    return available
+
+
+def choose_encoding(accept_encoding: str, preference: Sequence[str]) -> Optional[str]:
+    """First encoding in `preference` the client accepts (q > 0), or None"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in preference:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Compress buffered response bodies with the best encoding the client accepts
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Sequence[str] = ("zstd", "br", "gzip"),
+        min_size: int = 1024,
+        gzip_level: int = 1,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        thread_min_size: int = 64 * 1024,
+        workers: int = 2,
+    ):
+        self.app = app
+        self.encoders = encoders(gzip_level, brotli_quality, zstd_level)
+        self.preference: List[str] = [name for name in encodings if name in self.encoders]
+        self.min_size = min_size
+        self.thread_min_size = thread_min_size
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def compress(self, encoding: str, body: bytes) -> bytes:
+        compress = self.encoders[encoding]
+        if len(body) < self.thread_min_size:
+            return compress(body)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="compress")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, compress, body)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.preference:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.preference)
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held until the first body message shows whether the body is complete
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.min_size
+                or not compressible(headers.get("content-type", ""))
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                compressed = await self.compress(encoding, body)
+                compression_input_bytes.inc((encoding,), len(body))
+                compression_output_bytes.inc((encoding,), len(compressed))
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                message = {**message, "body": compressed}
+            passthrough = True
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+        if start is not None and not passthrough:
+            # The app ended without a body message
+            await send(start)
+
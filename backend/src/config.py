@@ -31,17 +31,80 @@ class Settings(BaseSettings):
     db_username: Optional[str] = Field(None)
     db_password: Optional[str] = Field(None)
     
+    # Connection pool: pick a profile, then override individual options if needed.
+    # Unset (None) options fall back to the profile defaults in database.ENGINE_PROFILES.
+    db_profile: str = "api"  # api, worker or import
+    db_pool_size: Optional[int] = None
+    db_max_overflow: Optional[int] = None
+    db_pool_timeout: Optional[float] = None  # seconds to wait for a pooled connection
+    db_pool_recycle: Optional[int] = None  # seconds before a connection is replaced; -1 disables
+    db_pool_pre_ping: Optional[bool] = None  # SELECT 1 on every checkout
+    db_statement_cache_size: Optional[int] = None  # asyncpg prepared statements per connection
+    db_echo: bool = False  # log every SQL statement
+    
+    # Read replicas share the primary's credentials and db_name
+    db_replica_hosts: list[str] = []  # "host" or "host:port", e.g. ["hrdb-ro-1.internal"]
+    db_replica_retry_seconds: float = 30.0  # how long a failed replica is skipped
+    db_read_your_writes_seconds: float = 5.0  # reads stick to the primary after a client writes
+    
+    # Background database probe behind /health/ready
+    db_health_interval_seconds: float = 10.0
+    db_health_timeout_seconds: float = 2.0
+    
     # API
     api_prefix: str = "/api/v1"
+    max_page_size: int = 10_000  # largest `limit` accepted by GET /employees
+    export_batch_size: int = 1000  # rows fetched per round trip by /employees/export
+    bulk_chunk_size: int = 500  # rows per INSERT statement in /employees/bulk
+    bulk_max_rows: int = 10_000
+    bulk_max_bytes: int = 10 * 1024 * 1024
+    fast_json_responses: bool = True  # encode employee reads with orjson, skipping per-row validation
+    compression_enabled: bool = True
+    compression_encodings: list[str] = ["zstd", "br", "gzip"]  # preference order; br/zstd need brotli/zstandard
+    compression_min_size: int = 1024  # smaller bodies are sent as-is
+    compression_level: int = 1  # gzip level (1-9); 1 saves ~92% on employee JSON at 40% of the CPU of 6
+    compression_brotli_quality: int = 4  # 0-11
+    compression_zstd_level: int = 3  # 1-22
+    compression_thread_min_size: int = 64 * 1024  # larger bodies are compressed off the event loop
+    compression_workers: int = 2
     
     # Logging
     log_level: str = "INFO"
+    log_queue_size: int = 10_000  # records buffered for the log writer thread
+    log_batch_size: int = 100  # records written per write/flush
+    log_drop_policy: str = "newest"  # when the queue is full: drop "newest" or "oldest"
+    access_log: bool = True  # one JSON record per request with route, status and latency
+    metrics_enabled: bool = True  # per-route request metrics served at /metrics
+    sql_profiler_sample_rate: float = 0.0  # fraction of requests profiled (Server-Timing + SQL summary)
+    sql_profiler_repeat_threshold: int = 3  # same statement this often in one request is flagged as N+1
+    request_debug_sample_rate: float = 0.0  # fraction of list requests logged with query diagnostics
+    
+    # Response cache for employee reads
+    cache_enabled: bool = True
+    cache_backend: str = "memory"  # "memory" (per task) or "redis" (shared across tasks)
+    cache_ttl_seconds: float = 30.0
+    cache_max_entries: int = 1024  # memory backend only
+    cache_max_mb: int = 256  # memory backend only; estimated size of cached responses
+    cache_redis_url: Optional[str] = None  # e.g. redis://:password@host:6379/0
+    cache_key_prefix: str = "hrcache"
+    cache_redis_pool_size: int = 8  # concurrent Redis connections per task
+    cache_redis_retry_seconds: float = 5.0  # how long an unreachable Redis is skipped
     
     # CORS
     cors_origins: list[str] = ["*"]  # Restrict this in production
     
     # Security
     secret_key: Optional[str] = None
+    bcrypt_rounds: int = 12  # work factor; each step doubles hashing time (existing hashes upgrade on login)
+    auth_hash_workers: int = 2  # threads running bcrypt, bounding CPU spent on logins
+    auth_max_pending: int = 64  # hash/verify calls admitted to the executor; later callers wait
+    auth_verify_cache_seconds: float = 0.0  # remember successful verifications this long (0 = off)
+    auth_verify_cache_size: int = 10_000
+    auth_seed_test_users: bool = False  # create the built-in test accounts (passwords are in the docs) when the users table is empty; local dev only
+    jwt_algorithm: str = "HS256"
+    access_token_minutes: int = 60
+    token_cache_size: int = 10_000  # validated tokens kept with their claims
+    auth_required: bool = False  # reject employee requests without a valid bearer token
     
     @property
     def database_url(self) -> str:
@@ -52,6 +115,17 @@ class Settings(BaseSettings):
             )
         return f"postgresql+asyncpg://{self.db_username}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
     
+    @property
+    def replica_urls(self) -> list[str]:
+        """Construct async database URLs for the read replicas"""
+        urls = []
+        for host in self.db_replica_hosts:
+            name, _, port = host.partition(":")
+            urls.append(
+                f"postgresql+asyncpg://{self.db_username}:{self.db_password}@{name}:{port or self.db_port}/{self.db_name}"
+            )
+        return urls
+    
     @property
     def database_url_sync(self) -> str:
         """Construct synchronous database URL"""
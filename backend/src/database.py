@@ -1,24 +1,247 @@
 """
 Database connection and session management
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import create_engine, text
-from typing import AsyncGenerator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.schema import CreateIndex
+from typing import Any, AsyncGenerator, Dict, List, Optional
+import asyncio
+import hashlib
+import hmac
+import itertools
 import logging
+import secrets
+import threading
+import time
 
+from src import metrics, profiler
 from src.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Pool defaults per workload. The API favours many short checkouts and relies on
+# pool_recycle (shorter than RDS idle timeouts) instead of a pre-ping round trip
+# on every checkout; workers hold fewer, longer-lived connections; imports use a
+# single connection with large prepared statement caches.
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "api": {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_timeout": 5.0,
+        "pool_recycle": 300,
+        "pool_pre_ping": False,
+        "statement_cache_size": 500,
+    },
+    "worker": {
+        "pool_size": 2,
+        "max_overflow": 2,
+        "pool_timeout": 30.0,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_cache_size": 100,
+    },
+    "import": {
+        "pool_size": 1,
+        "max_overflow": 0,
+        "pool_timeout": 60.0,
+        "pool_recycle": -1,
+        "pool_pre_ping": True,
+        "statement_cache_size": 1000,
+    },
+}
+
+
+def engine_options(profile: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve pool options for a profile, with any db_* settings taking precedence
+    """
+    profile = profile or settings.db_profile
+    if profile not in ENGINE_PROFILES:
+        raise RuntimeError(
+            f"Unknown db_profile {profile!r}. Choose from: {', '.join(ENGINE_PROFILES)}"
+        )
+    options = dict(ENGINE_PROFILES[profile])
+    overrides = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "statement_cache_size": settings.db_statement_cache_size,
+    }
+    options.update({k: v for k, v in overrides.items() if v is not None})
+    options["echo"] = settings.db_echo
+    return options
+
+
+class PoolMetrics:
+    """
+    Checkout counters and wait times for sizing the pool against RDS max_connections
+    """
+
+    # Upper bounds (seconds) of the wait-time histogram buckets
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * (len(self.BUCKETS) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"le_{b}" for b in self.BUCKETS] + ["le_inf"]
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_histogram": dict(zip(labels, self.wait_buckets)),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started)
+        return conn
+
+
+def create_engine_for(profile: Optional[str] = None, url: Optional[str] = None):
+    """
+    Create an async engine using the pool options of a profile
+    """
+    options = engine_options(profile)
+    url = url or settings.database_url
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        connect_args["prepared_statement_cache_size"] = options["statement_cache_size"]
+    new_engine = create_async_engine(
+        url,
+        echo=options["echo"],
+        poolclass=InstrumentedQueuePool,
+        pool_size=options["pool_size"],
+        max_overflow=options["max_overflow"],
+        pool_timeout=options["pool_timeout"],
+        pool_recycle=options["pool_recycle"],
+        pool_pre_ping=options["pool_pre_ping"],
+        connect_args=connect_args,
+    )
+
+    instrument_engine(new_engine)
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_metrics.connects += 1
+
+    @event.listens_for(new_engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        pool_metrics.checkins += 1
+
+    return new_engine
+
+
+def instrument_engine(target: AsyncEngine) -> None:
+    """
+    Add each statement's execution time to the current request's DB stats,
+    and to its SQL profile when the request is being profiled
+    """
+    @event.listens_for(target.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(target.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = metrics.request_db_stats.get()
+        if stats is not None:
+            stats.seconds += elapsed
+            stats.statements += 1
+        query_profile = profiler.active_profile.get()
+        if query_profile is not None:
+            query_profile.record(statement, elapsed)
+
+
+def collect_pool_metrics():
+    """
+    Pool gauges and checkout counters for the /metrics endpoint
+    """
+    status = pool_status()
+    snapshot = status["metrics"]
+    gauges = metrics.Gauge("db_pool_connections", "Connections in the primary pool by state", ("state",))
+    for state in ("checked_out", "checked_in", "overflow"):
+        if state in status:
+            gauges.set(status[state], (state,))
+    counters = metrics.Counter("db_pool_events_total", "Primary pool checkout events", ("event",))
+    for name in ("checkouts", "checkins", "connects", "timeouts"):
+        counters.values[(name,)] = snapshot[name]
+    wait = metrics.Counter("db_pool_wait_seconds_total", "Time spent waiting for a pooled connection")
+    wait.values[()] = snapshot["wait_seconds_total"]
+    return [gauges, counters, wait]
+
+
+def pool_status() -> Dict[str, Any]:
+    """
+    Current pool occupancy plus checkout metrics
+    """
+    pool = engine.pool
+    status: Dict[str, Any] = {"profile": settings.db_profile, "metrics": pool_metrics.snapshot()}
+    if hasattr(pool, "checkedout"):
+        size = pool.size()
+        status.update({
+            "size": size,
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(pool.checkedout() / (size + max(pool._max_overflow, 0)), 4),
+        })
+    return status
+
+
 # Async engine for FastAPI
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.environment == "dev",
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-)
+engine = create_engine_for()
+metrics.registry.add_collector(collect_pool_metrics)
 
 # Async session maker
 AsyncSessionLocal = async_sessionmaker(
@@ -30,6 +253,186 @@ AsyncSessionLocal = async_sessionmaker(
 # Base class for models
 Base = declarative_base()
 
+# Cookie holding the signed time until which a client's reads go to the primary
+READ_PRIMARY_COOKIE = "hr_read_primary_until"
+# Same value as the cookie, for cross-origin clients that do not send
+# credentials: echo the response header back on later requests
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+
+class Replica:
+    """
+    A read replica engine and its health state
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine_for(url=url)
+        self.down_until = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def host(self) -> str:
+        return self.engine.url.host or self.url
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+
+class ReplicaRouter:
+    """
+    Round-robin read routing across replicas with failover to the primary.
+
+    A replica that fails to hand out a connection is skipped for
+    `db_replica_retry_seconds`; when none are usable, reads go to the primary.
+    """
+
+    def __init__(self, urls: List[str], retry_seconds: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self.primary_reads = 0
+
+    def candidates(self) -> List[Replica]:
+        """
+        Healthy replicas, starting from the next one in round-robin order
+        """
+        if not self.replicas:
+            return []
+        start = next(self._counter) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        now = time.monotonic()
+        return [replica for replica in ordered if replica.healthy(now)]
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        replica.down_until = time.monotonic() + self.retry_seconds
+        replica.last_error = str(error)
+        logger.warning(f"Read replica {replica.host} unavailable, skipping for {self.retry_seconds}s: {error}")
+
+    async def open_connection(self, use_primary: bool = False) -> AsyncConnection:
+        """
+        Autocommit connection on the next healthy replica, or on the primary
+        """
+        if not use_primary:
+            for replica in self.candidates():
+                try:
+                    return await autocommit_connection(replica.engine)
+                except (OSError, exc.DBAPIError, exc.TimeoutError) as e:
+                    self.mark_down(replica, e)
+        self.primary_reads += 1
+        return await autocommit_connection(engine)
+
+    async def check(self) -> None:
+        """
+        Ping every replica, restoring the ones that answer
+        """
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                replica.down_until = 0.0
+                replica.last_error = None
+            except Exception as e:
+                self.mark_down(replica, e)
+
+    def status(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "host": replica.host,
+                "healthy": replica.healthy(now),
+                "retry_in_seconds": round(max(replica.down_until - now, 0.0), 1),
+                "last_error": replica.last_error,
+            }
+            for replica in self.replicas
+        ]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+async def autocommit_connection(target: AsyncEngine) -> AsyncConnection:
+    """
+    Check out a connection in autocommit mode, so a single SELECT runs
+    without the BEGIN/COMMIT round trips of a session transaction
+    """
+    conn = await target.connect()
+    # pysqlite never sends BEGIN for a SELECT, so switching isolation there
+    # only adds work
+    if target.dialect.name == "sqlite":
+        return conn
+    try:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+    except BaseException:
+        await conn.close()
+        raise
+    return conn
+
+
+replica_router = ReplicaRouter(settings.replica_urls, settings.db_replica_retry_seconds)
+
+
+# Signs read-your-writes deadlines so clients cannot mint their own. Without
+# secret_key (dev only, see security.token_service) deadlines are only valid
+# on the task that issued them, which still covers a single-process server.
+_read_primary_key = (settings.secret_key or secrets.token_urlsafe(32)).encode()
+
+
+def _read_primary_signature(until: str) -> str:
+    return hmac.new(_read_primary_key, f"read-primary:{until}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def read_primary_token(until: float) -> str:
+    """Signed "<deadline>.<signature>" value for the read-your-writes header and cookie"""
+    stamp = f"{until:.3f}"
+    return f"{stamp}.{_read_primary_signature(stamp)}"
+
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    """
+    True while the client is inside its read-your-writes window, signalled
+    by the X-Read-Primary-Until header or the hr_read_primary_until cookie.
+
+    Only deadlines issued by remember_write count, and only while replicas
+    are configured; otherwise every read already sees the primary, and
+    honouring the header would just let a client skip the response cache.
+    """
+    if not replica_router.replicas:
+        return False
+    value = request.headers.get(READ_PRIMARY_HEADER) or request.cookies.get(READ_PRIMARY_COOKIE, "")
+    stamp, _, signature = value.rpartition(".")
+    if not hmac.compare_digest(signature.encode(), _read_primary_signature(stamp).encode()):
+        return False
+    try:
+        until = float(stamp)
+    except ValueError:
+        return False
+    return time.time() < until <= time.time() + settings.db_read_your_writes_seconds
+
+
+def remember_write(response: Response) -> None:
+    """
+    Route this client's reads to the primary until replicas have caught up.
+
+    The deadline goes out both as a cookie, for same-origin clients, and as
+    the X-Read-Primary-Until header. The cookie is not stored by browsers
+    calling the API cross-origin without credentials (the frontend's
+    axios client), so the frontend echoes the header instead.
+    """
+    if not replica_router.replicas:
+        return
+    window = settings.db_read_your_writes_seconds
+    until = read_primary_token(time.time() + window)
+    response.headers[READ_PRIMARY_HEADER] = until
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        until,
+        max_age=max(int(window), 1),
+        httponly=True,
+        samesite="lax",
+    )
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -46,6 +449,63 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+class ReadConnection:
+    """
+    A read connection checked out on first use.
+
+    Requests answered from the response cache, or with a 304, never run a
+    statement, so they never take a pool slot or wait on pool_timeout, and
+    keep working from the cache while the database is unreachable.
+    """
+
+    def __init__(self, use_primary: bool = False):
+        self.use_primary = use_primary
+        self._conn: Optional[AsyncConnection] = None
+
+    async def connection(self) -> AsyncConnection:
+        if self._conn is None:
+            self._conn = await replica_router.open_connection(use_primary=self.use_primary)
+        return self._conn
+
+    async def execute(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        return await (await self.connection()).execute(statement, *args, **kwargs)
+
+    async def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            await conn.close()
+
+
+async def get_read_connection(request: Request) -> AsyncGenerator[ReadConnection, None]:
+    """
+    Dependency to get a Core connection for single-statement reads.
+
+    No ORM session, identity map or transaction: results are plain rows.
+    Served by a replica when configured, or by the primary while the client
+    is inside its read-your-writes window. The connection is only checked
+    out when the first statement runs (see ReadConnection).
+    """
+    conn = ReadConnection(use_primary=reads_pinned_to_primary(request))
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+def create_missing_indexes(conn) -> None:
+    """
+    CREATE INDEX IF NOT EXISTS for every index declared on the models.
+
+    create_all skips tables that already exist together with their indexes,
+    so indexes added to a model after its table was first created would
+    never reach a deployed database. Running this after create_all is a
+    no-op once they exist.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 async def init_db():
     """
     Initialize database tables
@@ -56,6 +516,7 @@ async def init_db():
         
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_missing_indexes)
         
         logger.info("Database tables created successfully")
     except Exception as e:
@@ -63,17 +524,107 @@ async def init_db():
         raise
 
 
-async def check_db_connection() -> bool:
+class DbHealthMonitor:
     """
-    Check if database connection is working
+    Probe the database in the background so health checks never touch the pool.
+
+    Every `interval` seconds the primary is sent SELECT 1 over a dedicated,
+    unpooled connection bounded by `timeout`, and replicas are re-checked.
+    Readiness probes read the cached result instead of checking out one of
+    the connections real requests are waiting for.
     """
-    try:
-        async with engine.connect() as conn:
-            await conn.execute(text("SELECT 1"))
-        return True
-    except Exception as e:
-        logger.error(f"Database connection failed: {e}")
-        return False
 
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self.healthy: Optional[bool] = None
+        self.latency_ms: Optional[float] = None
+        self.last_checked: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self.probes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._probe_engine: Optional[AsyncEngine] = None
+
+    def _engine(self) -> AsyncEngine:
+        # Follows the module engine's URL, so a swapped engine is probed too
+        if self._probe_engine is None or self._probe_engine.url != engine.url:
+            self._probe_engine = create_async_engine(engine.url, poolclass=NullPool)
+        return self._probe_engine
+
+    async def probe(self) -> bool:
+        """
+        Run one SELECT 1 against the primary and record the outcome
+        """
+        async def ping():
+            async with self._engine().connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        self.probes += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(ping(), self.timeout)
+        except Exception as e:
+            self.healthy = False
+            self.consecutive_failures += 1
+            self.last_error = str(e) or type(e).__name__
+            logger.error(f"Database health probe failed: {self.last_error}")
+        else:
+            self.healthy = True
+            self.consecutive_failures = 0
+            self.last_success = time.monotonic()
+            self.last_error = None
+        self.latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.last_checked = time.monotonic()
+        return self.healthy
+
+    def stale(self) -> bool:
+        """
+        True before the first probe, or when the background loop has stopped reporting
+        """
+        if self.last_checked is None:
+            return True
+        return time.monotonic() - self.last_checked > 2 * self.interval + self.timeout
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe()
+                if replica_router.replicas:
+                    await asyncio.wait_for(replica_router.check(), self.timeout * len(replica_router.replicas))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Database health monitor error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._probe_engine is not None:
+            await self._probe_engine.dispose()
+            self._probe_engine = None
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "healthy": bool(self.healthy),
+            "latency_ms": self.latency_ms,
+            "last_success_age_seconds": round(now - self.last_success, 3) if self.last_success is not None else None,
+            "checked_age_seconds": round(now - self.last_checked, 3) if self.last_checked is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
 
 
+db_monitor = DbHealthMonitor(settings.db_health_interval_seconds, settings.db_health_timeout_seconds)
@@ -6,14 +6,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
+from src.cache import response_cache
+from src.compression import CompressionMiddleware
 from src.config import settings
-from src.database import init_db
+from src.database import READ_PRIMARY_HEADER, db_monitor, init_db, replica_router
+from src.metrics import MetricsMiddleware
+from src.middleware import REQUEST_ID_HEADER, RequestContextMiddleware
+from src.profiler import SqlProfilerMiddleware
 from src.routes import health, employees, auth
+from src.utils.logger import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Configure logging: structured JSON, written off the event loop
+setup_logging(
+    settings.log_level,
+    queue_size=settings.log_queue_size,
+    batch_size=settings.log_batch_size,
+    drop_policy=settings.log_drop_policy,
 )
 logger = logging.getLogger(__name__)
 
@@ -35,10 +43,22 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         # Don't fail startup - let health checks handle it
     
+    if settings.auth_seed_test_users:
+        try:
+            await auth.seed_test_users()
+        except Exception as e:
+            logger.error(f"Failed to seed test users: {e}")
+    
+    await response_cache.start()
+    db_monitor.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    await db_monitor.stop()
+    await response_cache.close()
+    await replica_router.dispose()
 
 
 # Create FastAPI app
@@ -56,7 +76,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[employees.NEXT_CURSOR_HEADER, "ETag", REQUEST_ID_HEADER, "Server-Timing", READ_PRIMARY_HEADER],
 )
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.compression_encodings,
+        min_size=settings.compression_min_size,
+        gzip_level=settings.compression_level,
+        brotli_quality=settings.compression_brotli_quality,
+        zstd_level=settings.compression_zstd_level,
+        thread_min_size=settings.compression_thread_min_size,
+        workers=settings.compression_workers,
+    )
+app.add_middleware(SqlProfilerMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware, access_log=settings.access_log)
 
 # Include routers
 app.include_router(health.router, tags=["Health"])
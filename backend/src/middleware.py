@@ -0,0 +1,80 @@
+"""
+ASGI middleware
+"""
+import logging
+import re
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.logger import request_context
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Incoming request ids are reused only if they look like ids, so clients
+# cannot inject arbitrary text into the logs
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+access_logger = logging.getLogger("access")
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route (e.g. /api/v1/employees/{employee_id}), or the raw path"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path", "")
+
+
+class RequestContextMiddleware:
+    """
+    Tag every log record emitted while handling a request with its request_id
+    and method, echo the id in X-Request-ID, and log one access record with
+    route, status and latency when the response is done.
+
+    Written as plain ASGI rather than BaseHTTPMiddleware so streamed bodies
+    pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, access_log: bool = True):
+        self.app = app
+        self.access_log = access_log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_RE.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        token = request_context.set({"request_id": request_id, "method": scope["method"]})
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if self.access_log:
+                access_logger.info(
+                    f"{scope['method']} {scope['path']} {status_code}",
+                    extra={
+                        "route": route_template(scope),
+                        "status_code": status_code,
+                        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+                    },
+                )
+            request_context.reset(token)
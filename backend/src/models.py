@@ -1,7 +1,8 @@
 """
 SQLAlchemy database models
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import CheckConstraint, Column, Integer, String, DateTime, Boolean, Text, Index
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from src.database import Base
 
@@ -26,10 +27,68 @@ class Employee(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # Directory filters with id for keyset paging
+        Index("ix_employees_department_id", "department", "id"),
+        Index("ix_employees_position_id", "position", "id"),
+        Index("ix_employees_is_active_id", "is_active", "id"),
+        # Sortable columns paired with id as the keyset tie-breaker
+        Index("ix_employees_last_name_id", "last_name", "id"),
+        Index("ix_employees_first_name_id", "first_name", "id"),
+        Index("ix_employees_hire_date_id", "hire_date", "id"),
+        # max(updated_at) feeds the table version used for ETags
+        Index("ix_employees_updated_at", "updated_at"),
+        # Case-insensitive prefix search; text_pattern_ops lets Postgres use
+        # the index for LIKE 'abc%' regardless of the database collation
+        Index(
+            "ix_employees_lower_first_name",
+            func.lower(first_name).label("lower_first_name"),
+            postgresql_ops={"lower_first_name": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_employees_lower_last_name",
+            func.lower(last_name).label("lower_last_name"),
+            postgresql_ops={"lower_last_name": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_employees_lower_email",
+            func.lower(email).label("lower_email"),
+            postgresql_ops={"lower_email": "text_pattern_ops"},
+        ),
+    )
+    
     def __repr__(self):
         return f"<Employee {self.employee_id}: {self.first_name} {self.last_name}>"
 
 
+class User(Base):
+    """
+    Login account. Emails are stored lowercased, so a login is a single
+    equality probe on the unique email index.
+    """
+    __tablename__ = "users"
+    
+    id = Column(Integer, primary_key=True)
+    email = Column(String(255), unique=True, index=True, nullable=False)
+    password_hash = Column(String(100), nullable=False)
+    name = Column(String(200), nullable=False)
+    role = Column(String(50), nullable=False, default="employee")
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        CheckConstraint("email = lower(email)", name="ck_users_email_lowercase"),
+    )
+    
+    @validates("email")
+    def normalize_email(self, key, email):
+        return email.strip().lower()
+    
+    def __repr__(self):
+        return f"<User {self.email} ({self.role})>"
+
+
 class SystemHealth(Base):
     """
     System health tracking
@@ -0,0 +1,112 @@
+"""
+Sampled per-request SQL profiler.
+
+When a request is sampled (`sql_profiler_sample_rate`), every statement
+executed on an instrumented engine while handling it is recorded (see
+database.instrument_engine). The response gets a Server-Timing header with
+the database time, and a summary with the slowest and repeated statements
+is logged to the request_debug logger; repeated statements (the same SQL
+run `sql_profiler_repeat_threshold` times or more, typically an N+1 loop)
+are logged as a warning.
+"""
+import contextvars
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.metrics import UNMATCHED_ROUTE
+from src.utils.logger import debug_sampled, request_debug_logger
+
+# Characters of SQL kept per statement in the logged summary
+STATEMENT_PREVIEW = 300
+
+
+class QueryProfile:
+    """
+    Statements executed by one request, in execution order
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements: List[Tuple[str, float]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements.append((statement, seconds))
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.statements)
+
+    def server_timing(self) -> str:
+        count = len(self.statements)
+        return f'db;dur={self.db_seconds * 1000:.3f};desc="{count} statement{"" if count == 1 else "s"}"'
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        """Statements run at least `threshold` times, most frequent first"""
+        groups: Dict[str, List[float]] = {}
+        for statement, seconds in self.statements:
+            groups.setdefault(" ".join(statement.split()), []).append(seconds)
+        return [
+            {"sql": sql[:STATEMENT_PREVIEW], "count": len(times), "total_ms": round(sum(times) * 1000, 3)}
+            for sql, times in sorted(groups.items(), key=lambda item: -len(item[1]))
+            if len(times) >= threshold
+        ]
+
+    def summary(self, slowest: int = 5, repeat_threshold: int = 3) -> Dict[str, Any]:
+        ranked = sorted(self.statements, key=lambda item: -item[1])[:slowest]
+        return {
+            "statements": len(self.statements),
+            "db_ms": round(self.db_seconds * 1000, 3),
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "slowest": [
+                {"sql": " ".join(sql.split())[:STATEMENT_PREVIEW], "ms": round(seconds * 1000, 3)}
+                for sql, seconds in ranked
+            ],
+            "repeated": self.repeated(repeat_threshold),
+        }
+
+
+# Profile of the request being handled, when it was sampled
+active_profile: contextvars.ContextVar[Optional[QueryProfile]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+class SqlProfilerMiddleware:
+    """
+    Profile a sample of requests; unsampled requests pay one comparison
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not debug_sampled(settings.sql_profiler_sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = active_profile.set(profile)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            active_profile.reset(token)
+            summary = profile.summary(repeat_threshold=settings.sql_profiler_repeat_threshold)
+            summary["method"] = scope["method"]
+            summary["route"] = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            if summary["repeated"]:
+                request_debug_logger.warning(
+                    f"Repeated SQL in {summary['method']} {summary['route']} (possible N+1)",
+                    extra={"debug": summary},
+                )
+            else:
+                request_debug_logger.debug("sql profile", extra={"debug": summary})
@@ -0,0 +1,46 @@
+"""
+Fast JSON responses for large employee payloads
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def json_default(value: Any) -> Any:
+    """Encode values the way pydantic's JSON mode (and orjson with OPT_UTC_Z) does"""
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=json_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+
+    Routes return it directly with rows already shaped like their response
+    model, which skips per-row pydantic validation as well as the stdlib
+    encoder. Output matches what the response model would have produced.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,12 +1,23 @@
 """
-Authentication endpoints for testing and mock auth
+Authentication endpoints
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
+
+from src import database
+from src.database import get_db
+from src.models import User
+from src.security import TokenUser, get_current_user, password_hasher, token_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Mock test users (same as frontend)
+# Built-in test accounts (same as frontend), created by seed_test_users
 TEST_USERS = [
     {"email": "sarah.chen@blackflag.hr", "password": "Admin123!", "role": "hr_admin", "name": "Sarah Chen"},
     {"email": "hr.manager@blackflag.hr", "password": "HRPass123!", "role": "hr_admin", "name": "HR Manager"},
@@ -25,38 +36,90 @@ class LoginResponse(BaseModel):
     success: bool
     message: str
     user: dict | None = None
+    access_token: str | None = None
+    token_type: str = "bearer"
+    expires_in: int | None = None
+
+
+async def seed_test_users() -> int:
+    """
+    Create TEST_USERS with hashed passwords when the users table is empty.
+    Returns the number of accounts created.
+    """
+    async with database.AsyncSessionLocal() as session:
+        existing = await session.scalar(select(func.count()).select_from(User))
+        if existing:
+            return 0
+        hashes = await asyncio.gather(*(password_hasher.hash(u["password"]) for u in TEST_USERS))
+        session.add_all([
+            User(email=u["email"], password_hash=password_hash, name=u["name"], role=u["role"])
+            for u, password_hash in zip(TEST_USERS, hashes)
+        ])
+        await session.commit()
+    logger.info(f"Seeded {len(TEST_USERS)} test users")
+    return len(TEST_USERS)
 
 
 @router.post("/auth/login", response_model=LoginResponse)
-async def login(request: LoginRequest):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     """
-    Mock authentication endpoint for testing.
-    Validates credentials against test user list.
-    In production, this would check against database with hashed passwords.
+    Authenticate against the users table.
+
+    The lookup is one probe on the unique lowercase email index; bcrypt runs
+    in the password hasher's thread pool, not on the event loop. Unknown
+    emails still pay for a bcrypt check so they take as long as a wrong
+    password. Hashes made with an outdated work factor are upgraded here.
+
+    The response carries a signed access token with the user's id and role;
+    send it as `Authorization: Bearer <token>` so later requests are
+    authorized without looking the user up again.
     """
-    user = next(
-        (u for u in TEST_USERS if u["email"].lower() == request.email.lower() and u["password"] == request.password),
-        None
-    )
+    result = await db.execute(select(User).where(User.email == request.email.strip().lower()))
+    user = result.scalar_one_or_none()
+    
+    if user is None or not user.is_active:
+        await password_hasher.verify_dummy(request.password)
+        valid = False
+    else:
+        valid = await password_hasher.verify(request.password, user.password_hash)
     
-    if not user:
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password_hash = await password_hasher.hash(request.password)
+    
     return LoginResponse(
         success=True,
-        message=f"Welcome {user['name']}!",
+        message=f"Welcome {user.name}!",
         user={
-            "email": user["email"],
-            "name": user["name"],
-            "role": user["role"],
-        }
+            "email": user.email,
+            "name": user.name,
+            "role": user.role,
+        },
+        access_token=token_service.issue(user.id, user.email, user.name, user.role),
+        expires_in=token_service.ttl_seconds,
     )
 
 
+@router.get("/auth/me", response_model=dict)
+async def me(user: TokenUser | None = Depends(get_current_user)):
+    """The user identified by the bearer token"""
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user.to_dict()
+
+
 @router.post("/auth/logout", response_model=dict)
-async def logout():
-    """Logout endpoint"""
+async def logout(user: TokenUser | None = Depends(get_current_user)):
+    """Logout endpoint; revokes the bearer token when one is sent"""
+    if user is not None:
+        token_service.revoke(user)
     return {"success": True, "message": "Logged out successfully"}
@@ -1,17 +1,66 @@
 """
 Employee management endpoints (for future HR platform)
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
-from pydantic import BaseModel
-from datetime import datetime
+from sqlalchemy import and_, case, func, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from typing import Any, AsyncIterator, List, Mapping
+from pydantic import BaseModel, ValidationError
+from datetime import datetime, timedelta, timezone
+import base64
+import csv
+import hashlib
+import io
+import json
+import logging
+import time
 
-from src.database import get_db
+from src import database
+from src.cache import NullCache, ResponseCache, cache_key, response_cache
+from src.config import settings
+from src.database import ReadConnection, get_db, get_read_connection, reads_pinned_to_primary, remember_write
 from src.models import Employee
+from src.responses import FastJSONResponse
+from src.security import get_current_user, require_role
+from src.utils.logger import debug_sampled, request_debug_logger
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Identity comes from the bearer token alone (see security.get_current_user),
+# so authorization adds no database round trip
+router = APIRouter(dependencies=[Depends(get_current_user)])
+
+# Response header carrying the keyset cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Synthetic salary by position, used to surface averages in the UI
+SALARY_MAP = {
+    "Senior Staff": 160_000,
+    "Senior Engineer": 150_000,
+    "Engineer": 120_000,
+    "Staff": 100_000,
+    "Assistant Engineer": 90_000,
+    "Technique Leader": 140_000,
+    "Manager": 180_000,
+}
+DEFAULT_SALARY = 110_000
+
+# Range of the Integer primary key, checked before a cursor id reaches SQL
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+# Columns the list endpoint can sort by; prefix with "-" for descending.
+# Each is backed by an index in models.py with id as the tie-breaker.
+SORT_COLUMNS = {
+    "id": Employee.id,
+    "first_name": Employee.first_name,
+    "last_name": Employee.last_name,
+    "email": Employee.email,
+    "department": Employee.department,
+    "hire_date": Employee.hire_date,
+}
 
 
 # Pydantic schemas
@@ -41,75 +90,716 @@ class EmployeeResponse(EmployeeBase):
     model_config = {"from_attributes": True}
 
 
-@router.post("/employees", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
+class BulkRowResult(BaseModel):
+    index: int
+    employee_id: str | None = None
+    status: str  # created, updated or error
+    id: int | None = None
+    detail: str | None = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkRowResult]
+
+
+class DepartmentStats(BaseModel):
+    department: str | None
+    headcount: int
+    active: int
+    recent_hires: int
+    average_salary: int | None
+
+
+class EmployeeStats(BaseModel):
+    total: int
+    active: int
+    recent_hires: int
+    recent_days: int
+    average_salary: int | None
+    departments: List[DepartmentStats]
+
+
+# Response fields in schema order, and the table columns behind them
+RESPONSE_FIELDS = list(EmployeeResponse.model_fields)
+RESPONSE_COLUMNS = [Employee.__table__.c[name] for name in RESPONSE_FIELDS if name != "salary"]
+
+
+def parse_sort(sort: str) -> tuple[str, bool]:
+    """Split a sort parameter into its column name and descending flag"""
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in SORT_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort. Choose from: {', '.join(SORT_COLUMNS)}"
+        )
+    return name, descending
+
+
+def encode_cursor(last: Mapping[str, Any], sort: str) -> str:
+    """Encode the sort key and primary key of the last row as an opaque, URL-safe cursor"""
+    name, _ = parse_sort(sort)
+    value = last[name]
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort, "v": value, "id": last["id"]}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_int32(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and INT32_MIN <= value <= INT32_MAX
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor, raising 400 if it is malformed.
+
+    The sort value must have the sort column's type and the id must fit the
+    Integer primary key, so a tampered cursor fails here rather than in the
+    database.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        if data.get("s", "id") != sort:
+            raise ValueError("cursor was issued for a different sort")
+        value, last_id = data.get("v"), data["id"]
+        if not _is_int32(last_id):
+            raise ValueError("cursor id is not a valid primary key")
+        column = SORT_COLUMNS[sort.lstrip("-")]
+        if column is Employee.id:
+            if value is not None and not _is_int32(value):
+                raise ValueError("cursor value is not a valid primary key")
+        elif value is not None:
+            if not isinstance(value, str):
+                raise ValueError("cursor value does not match the sort column")
+            if column is Employee.hire_date:
+                value = datetime.fromisoformat(value)
+        return value, last_id
+    except (ValueError, KeyError, TypeError, AttributeError, OverflowError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_predicate(column, descending: bool, value: Any, last_id: int):
+    """
+    Rows strictly after (value, last_id) in ORDER BY column, id, for a
+    non-NULL value. A plain row-value comparison, so Postgres can seek on the
+    (column, id) index; NULL sort values are fetched separately (see
+    fetch_keyset_page) because an OR with IS NULL defeats the seek.
+    """
+    if column is Employee.id:
+        return Employee.id < last_id if descending else Employee.id > last_id
+    if descending:
+        return tuple_(column, Employee.id) < tuple_(value, last_id)
+    return tuple_(column, Employee.id) > tuple_(value, last_id)
+
+
+async def fetch_keyset_page(db: ReadConnection, query, column, descending: bool, limit: int,
+                            cursor: tuple[Any, int] | None) -> list:
+    """
+    One page in ORDER BY column, id with NULLs last, as up to two index
+    scans: the non-NULL rows after the cursor, then, only when the page is
+    not full yet, the NULL rows in id order. Each part is ordered exactly
+    like the ascending (column, id) index, which Postgres can walk forwards
+    or backwards, so every page costs the same however deep it is.
+    """
+    id_order = Employee.id.desc() if descending else Employee.id.asc()
+    value, last_id = cursor if cursor is not None else (None, None)
+    rows = []
+    if cursor is None or value is not None:
+        seek = query.where(column.is_not(None))
+        if cursor is not None:
+            seek = seek.where(keyset_predicate(column, descending, value, last_id))
+        seek = seek.order_by(column.desc() if descending else column.asc(), id_order).limit(limit)
+        rows = list((await db.execute(seek)).mappings().all())
+    if len(rows) < limit:
+        tail = query.where(column.is_(None))
+        if cursor is not None and value is None:
+            tail = tail.where(Employee.id < last_id if descending else Employee.id > last_id)
+        tail = tail.order_by(id_order).limit(limit - len(rows))
+        rows.extend((await db.execute(tail)).mappings().all())
+    return rows
+
+
+def salary_for(position: str | None) -> int:
+    """Synthetic salary for a position"""
+    return SALARY_MAP.get((position or "").strip(), DEFAULT_SALARY)
+
+
+def salary_expression():
+    """SQL CASE expression equivalent to salary_for"""
+    return case(SALARY_MAP, value=func.trim(Employee.position), else_=DEFAULT_SALARY)
+
+
+def to_response(employee: Employee) -> dict:
+    """Serialize an employee, with its synthetic salary, for caching and responses"""
+    setattr(employee, "salary", salary_for(employee.position))
+    return EmployeeResponse.model_validate(employee).model_dump()
+
+
+def row_to_response(row: Mapping[str, Any]) -> dict:
+    """Response dict for a row selected with RESPONSE_COLUMNS"""
+    item = dict(row)
+    item["salary"] = salary_for(row["position"])
+    return item
+
+
+def json_response(content: Any, response: Response) -> Any:
+    """
+    Wrap rows that already match the response model in a FastJSONResponse,
+    keeping headers set on `response`. Returns content unchanged when
+    fast_json_responses is off, so FastAPI validates it against the
+    response model and renders the stdlib JSONResponse.
+    """
+    if not settings.fast_json_responses:
+        return content
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return FastJSONResponse(content, headers=headers)
+
+
+async def table_version(db: ReadConnection | AsyncSession) -> str:
+    """
+    Cheap version stamp for the employees table: newest id and newest update.
+    Both columns are indexed so this is two index lookups, and the result is
+    cached until the next write invalidates the response cache.
+    """
+    async def load():
+        result = await db.execute(select(func.max(Employee.id), func.max(Employee.updated_at)))
+        max_id, max_updated_at = result.one()
+        return f"{max_id or 0}:{max_updated_at.isoformat() if max_updated_at else ''}"
+
+    return await response_cache.get_or_load("employees_version", load)
+
+
+# Used instead of response_cache for clients inside their read-your-writes window
+_uncached = NullCache()
+
+
+def read_cache(request: Request) -> ResponseCache:
+    """
+    The response cache, or a pass-through for clients that just wrote.
+
+    Their reads go to the primary (see database.reads_pinned_to_primary), but
+    the shared cache may have been refilled from a lagging replica by another
+    client since the write, so it is skipped for them as well.
+    """
+    return _uncached if reads_pinned_to_primary(request) else response_cache
+
+
+async def conditional_response(request: Request, response: Response, db: ReadConnection | AsyncSession,
+                               variant: str = "") -> Response | None:
+    """
+    Set an ETag for this URL at the current table version. Returns a 304
+    response when the client's If-None-Match already matches it. `variant`
+    covers anything else the body depends on, such as the current date.
+
+    Skipped for clients inside their read-your-writes window: the cached
+    table version could predate their write and yield a stale 304.
+    """
+    if reads_pinned_to_primary(request):
+        return None
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    version = await table_version(db)
+    digest = hashlib.sha1(f"{request.url.path}?{query}@{version}#{variant}".encode()).hexdigest()[:20]
+    etag = f'W/"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in candidates or etag.removeprefix("W/") in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@router.post("/employees", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(require_role("hr_admin"))])
 async def create_employee(
     employee: EmployeeCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     db_employee = Employee(**employee.model_dump())
     db.add(db_employee)
     await db.commit()
     await db.refresh(db_employee)
-    return db_employee
+    await response_cache.invalidate()
+    remember_write(response)
+    return to_response(db_employee)
+
+
+async def read_capped_body(request: Request, limit: int) -> bytes:
+    """
+    Read the request body, failing with 413 as soon as it exceeds `limit`
+    bytes: up front from Content-Length, else while streaming it in.
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Bulk payload exceeds {limit} bytes"
+    )
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    return bytes(body)
+
+
+def parse_bulk_body(body: bytes, content_type: str) -> list:
+    """Decode a bulk payload: a JSON array, or NDJSON with one object per line"""
+    try:
+        if "ndjson" in content_type:
+            return [json.loads(line) for line in body.splitlines() if line.strip()]
+        rows = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid bulk payload: {e}"
+        )
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bulk payload must be a JSON array or NDJSON"
+        )
+    return rows
+
+
+async def upsert_chunk(db: AsyncSession, chunk: list[tuple[int, EmployeeCreate]]) -> list[BulkRowResult]:
+    """
+    Upsert one chunk with a single INSERT ... ON CONFLICT (employee_id) DO UPDATE ... RETURNING.
+
+    A preliminary SELECT finds which employee_ids already exist (created vs
+    updated) and which emails belong to other employees; those rows are
+    reported as errors rather than failing the whole statement.
+    """
+    results: list[BulkRowResult] = []
+    existing = await db.execute(
+        select(Employee.employee_id, Employee.email).where(or_(
+            Employee.employee_id.in_([row.employee_id for _, row in chunk]),
+            Employee.email.in_([row.email for _, row in chunk]),
+        ))
+    )
+    existing_ids = set()
+    email_owner = {}
+    for employee_id, email in existing:
+        existing_ids.add(employee_id)
+        email_owner[email] = employee_id
+
+    values = []
+    pending = []
+    for index, row in chunk:
+        owner = email_owner.get(row.email)
+        if owner is not None and owner != row.employee_id:
+            results.append(BulkRowResult(
+                index=index, employee_id=row.employee_id, status="error",
+                detail=f"email already used by employee {owner}",
+            ))
+            continue
+        values.append(row.model_dump())
+        pending.append((index, row))
+    if not values:
+        return results
+
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(Employee).values(values)
+    update_columns = {
+        name: stmt.excluded[name] for name in EmployeeCreate.model_fields if name != "employee_id"
+    }
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Employee.employee_id],
+        set_={**update_columns, "updated_at": func.now()},
+    ).returning(Employee.id, Employee.employee_id)
+
+    try:
+        async with db.begin_nested():
+            returned = dict((employee_id, id_) for id_, employee_id in (await db.execute(stmt)).all())
+    except IntegrityError:
+        # A concurrent write raced the pre-check; report the chunk rather than abort the batch.
+        # The database message names constraints and values, so it is only logged.
+        logger.warning("Bulk upsert chunk conflicted with a concurrent write", exc_info=True)
+        return results + [
+            BulkRowResult(index=index, employee_id=row.employee_id, status="error",
+                          detail="conflicts with a concurrent write; retry the row")
+            for index, row in pending
+        ]
+
+    for index, row in pending:
+        results.append(BulkRowResult(
+            index=index,
+            employee_id=row.employee_id,
+            status="updated" if row.employee_id in existing_ids else "created",
+            id=returned.get(row.employee_id),
+        ))
+    return results
+
+
+@router.post("/employees/bulk", response_model=BulkResult, dependencies=[Depends(require_role("hr_admin"))])
+async def bulk_upsert_employees(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create or update many employees keyed on employee_id.
+
+    Accepts a JSON array of EmployeeCreate objects, or NDJSON when sent with
+    Content-Type: application/x-ndjson. Rows are written in chunks of
+    `bulk_chunk_size`, one statement per chunk. Each row is reported as
+    created, updated or error (invalid, duplicated in the payload, or email
+    owned by another employee); errors do not stop the other rows.
+    """
+    body = await read_capped_body(request, settings.bulk_max_bytes)
+    rows = parse_bulk_body(body, request.headers.get("content-type", ""))
+    if len(rows) > settings.bulk_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk payload exceeds {settings.bulk_max_rows} rows"
+        )
+
+    results: list[BulkRowResult] = []
+    valid: list[tuple[int, EmployeeCreate]] = []
+    seen: dict[str, int] = {}
+    seen_emails: dict[str, int] = {}
+    for index, raw in enumerate(rows):
+        try:
+            row = EmployeeCreate.model_validate(raw)
+        except ValidationError as e:
+            raw_id = raw.get("employee_id") if isinstance(raw, dict) else None
+            results.append(BulkRowResult(
+                index=index,
+                employee_id=str(raw_id)[:50] if raw_id is not None else None,
+                status="error",
+                detail=str(e.errors()[0]["msg"]),
+            ))
+            continue
+        if row.employee_id in seen:
+            results.append(BulkRowResult(
+                index=index, employee_id=row.employee_id, status="error",
+                detail=f"duplicate of row {seen[row.employee_id]}",
+            ))
+            continue
+        if row.email in seen_emails:
+            results.append(BulkRowResult(
+                index=index, employee_id=row.employee_id, status="error",
+                detail=f"email duplicates row {seen_emails[row.email]}",
+            ))
+            continue
+        seen[row.employee_id] = index
+        seen_emails[row.email] = index
+        valid.append((index, row))
+
+    chunk_size = settings.bulk_chunk_size
+    for start in range(0, len(valid), chunk_size):
+        results.extend(await upsert_chunk(db, valid[start:start + chunk_size]))
+    await db.commit()
+
+    if any(r.status != "error" for r in results):
+        await response_cache.invalidate()
+        remember_write(response)
+
+    results.sort(key=lambda r: r.index)
+    return BulkResult(
+        created=sum(r.status == "created" for r in results),
+        updated=sum(r.status == "updated" for r in results),
+        failed=sum(r.status == "error" for r in results),
+        results=results,
+    )
 
 
 @router.get("/employees", response_model=List[EmployeeResponse])
 async def list_employees(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=settings.max_page_size),
+    after: str | None = None,
+    department: str | None = None,
+    position: str | None = None,
+    is_active: bool | None = None,
+    search: str | None = None,
+    sort: str = "id",
+    db: ReadConnection = Depends(get_read_connection)
 ):
-    """List all employees"""
-    try:
-        result = await db.execute(
-            select(Employee)
-            .offset(skip)
-            .limit(limit)
+    """
+    List employees, optionally filtered and sorted.
+
+    `department`, `position` and `is_active` are exact matches; `search` is a
+    case-insensitive prefix match on first name, last name or email. `sort`
+    is one of SORT_COLUMNS, prefixed with "-" for descending.
+
+    Pass the X-Next-Cursor header of a page as `after` to fetch the next one;
+    this seeks on the (sort column, id) index so every page costs the same.
+    `skip` is kept as an offset fallback and is ignored when `after` is set.
+    """
+    sort_name, descending = parse_sort(sort)
+    sort_column = SORT_COLUMNS[sort_name]
+
+    query = select(*RESPONSE_COLUMNS)
+    if department is not None:
+        query = query.where(Employee.department == department)
+    if position is not None:
+        query = query.where(Employee.position == position)
+    if is_active is not None:
+        query = query.where(Employee.is_active == is_active)
+    if search:
+        prefix = escape_like(search.strip().lower()) + "%"
+        query = query.where(or_(
+            func.lower(Employee.first_name).like(prefix, escape="\\"),
+            func.lower(Employee.last_name).like(prefix, escape="\\"),
+            func.lower(Employee.email).like(prefix, escape="\\"),
+        ))
+
+    cursor = decode_cursor(after, sort) if after is not None else None
+    # Pages sorted by a nullable column come from fetch_keyset_page; an
+    # offset (skip without a cursor) falls back to one NULLS LAST query
+    keyset = sort_column is not Employee.id and (cursor is not None or skip == 0)
+    if sort_column is Employee.id:
+        query = query.order_by(Employee.id.desc() if descending else Employee.id.asc()).limit(limit)
+        if cursor is not None:
+            query = query.where(keyset_predicate(sort_column, descending, *cursor))
+        else:
+            query = query.offset(skip)
+    elif not keyset:
+        order = sort_column.desc() if descending else sort_column.asc()
+        query = query.order_by(order.nulls_last(), Employee.id.desc() if descending else Employee.id.asc())
+        query = query.limit(limit).offset(skip)
+
+    params = {
+        "skip": skip, "limit": limit, "after": after, "department": department,
+        "position": position, "is_active": is_active, "search": search, "sort": sort,
+    }
+    debug = debug_sampled(settings.request_debug_sample_rate)
+    started = time.perf_counter() if debug else 0.0
+    loaded = False
+
+    async def load():
+        nonlocal loaded
+        loaded = True
+        try:
+            if keyset:
+                employees = await fetch_keyset_page(db, query, sort_column, descending, limit, cursor)
+            else:
+                employees = (await db.execute(query)).mappings().all()
+        except Exception:
+            logger.exception("list_employees query failed", extra={"debug": params})
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to list employees"
+            )
+        next_cursor = None
+        if limit > 0 and len(employees) == limit:
+            next_cursor = encode_cursor(employees[-1], sort)
+        return [row_to_response(row) for row in employees], next_cursor
+
+    not_modified = await conditional_response(request, response, db)
+    if not_modified:
+        return not_modified
+
+    key = cache_key("list_employees", **params)
+    employees, next_cursor = await read_cache(request).get_or_load(key, load)
+    if debug:
+        request_debug_logger.debug("list_employees", extra={"debug": {
+            "params": params,
+            "rows": len(employees),
+            "first_id": employees[0]["id"] if employees else None,
+            "next_cursor": next_cursor,
+            "cache": "miss" if loaded else "hit",
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }})
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_response(employees, response)
+
+
+# Export formats: media type and file extension
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+def _export_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def stream_export(export_format: str) -> AsyncIterator[str]:
+    """
+    Yield the employee table in id order, one chunk per fetched batch.
+
+    Uses its own connection because request-scoped sessions are closed
+    before a streaming body is sent. Rows are streamed through a server-side
+    cursor as plain Core tuples, so memory stays flat regardless of table size.
+    """
+    fields = RESPONSE_FIELDS
+    query = (
+        select(*RESPONSE_COLUMNS)
+        .order_by(Employee.id)
+        .execution_options(yield_per=settings.export_batch_size)
+    )
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue()
+
+    async with database.engine.connect() as conn:
+        result = await conn.stream(query)
+        async for batch in result.mappings().partitions():
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in batch:
+                    writer.writerow(
+                        salary_for(row["position"]) if name == "salary" else _export_value(row[name])
+                        for name in fields
+                    )
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps({**row, "salary": salary_for(row["position"])}, default=_export_value) + "\n"
+                    for row in batch
+                )
+
+
+@router.get("/employees/export", dependencies=[Depends(require_role("hr_admin"))])
+async def export_employees(format: str = "ndjson"):
+    """
+    Stream every employee as NDJSON (one object per line) or CSV.
+
+    Each record has the same fields as EmployeeResponse. The body is written
+    as rows are fetched, so the first bytes go out immediately.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Choose from: {', '.join(EXPORT_FORMATS)}"
         )
-        employees = result.scalars().all()
-        # Compute a synthetic salary based on position to surface averages in the UI
-        salary_map = {
-            "Senior Staff": 160_000,
-            "Senior Engineer": 150_000,
-            "Engineer": 120_000,
-            "Staff": 100_000,
-            "Assistant Engineer": 90_000,
-            "Technique Leader": 140_000,
-            "Manager": 180_000,
-        }
-        for emp in employees:
-            base = salary_map.get((emp.position or "").strip(), 110_000)
-            setattr(emp, "salary", base)
-        print(f"DEBUG: Found {len(employees)} employees")
-        if employees:
-            print(f"DEBUG: First employee type: {type(employees[0])}")
-            print(f"DEBUG: First employee dict: {employees[0].__dict__}")
-        return employees
-    except Exception as e:
-        import traceback
-        error_msg = f"ERROR in list_employees: {e}\n{traceback.format_exc()}"
-        print(error_msg)
-        raise HTTPException(status_code=500, detail=str(e))
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_export(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="employees.{extension}"'},
+    )
+
+
+@router.get("/employees/stats", response_model=EmployeeStats)
+async def employee_stats(
+    request: Request,
+    response: Response,
+    recent_days: int = Query(90, ge=0, le=3650),
+    db: ReadConnection = Depends(get_read_connection)
+):
+    """
+    Headcount, active count, recent hires and average salary per department.
+
+    Aggregated in a single GROUP BY so the dashboard never downloads the
+    employee table. Recent hires and salary averages cover active employees.
+    Recent hires count from midnight UTC `recent_days` ago, so the counts,
+    their ETag and cache entry move on with the date even when no row changes.
+    """
+    cutoff = recent_hires_cutoff(recent_days)
+    not_modified = await conditional_response(request, response, db, variant=cutoff.date().isoformat())
+    if not_modified:
+        return not_modified
+
+    return await read_cache(request).get_or_load(
+        cache_key("employee_stats", recent_days=recent_days, cutoff=cutoff.date().isoformat()),
+        lambda: compute_stats(db, recent_days, cutoff),
+    )
+
+
+def recent_hires_cutoff(recent_days: int) -> datetime:
+    """Midnight UTC `recent_days` before today"""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=recent_days)
+
+
+async def compute_stats(db: ReadConnection | AsyncSession, recent_days: int,
+                        cutoff: datetime | None = None) -> EmployeeStats:
+    """Run the stats aggregate query"""
+    if cutoff is None:
+        cutoff = recent_hires_cutoff(recent_days)
+    is_active = Employee.is_active.is_(True)
+    result = await db.execute(
+        select(
+            Employee.department,
+            func.count().label("headcount"),
+            func.sum(case((is_active, 1), else_=0)).label("active"),
+            func.sum(case((and_(is_active, Employee.hire_date >= cutoff), 1), else_=0)).label("recent_hires"),
+            func.sum(case((is_active, salary_expression()), else_=0)).label("salary_total"),
+        )
+        .group_by(Employee.department)
+        .order_by(Employee.department)
+    )
+    rows = result.all()
+
+    departments = [
+        DepartmentStats(
+            department=row.department,
+            headcount=row.headcount,
+            active=row.active or 0,
+            recent_hires=row.recent_hires or 0,
+            average_salary=round(row.salary_total / row.active) if row.active else None,
+        )
+        for row in rows
+    ]
+    active = sum(d.active for d in departments)
+    salary_total = sum(row.salary_total or 0 for row in rows)
+    return EmployeeStats(
+        total=sum(d.headcount for d in departments),
+        active=active,
+        recent_hires=sum(d.recent_hires for d in departments),
+        recent_days=recent_days,
+        average_salary=round(salary_total / active) if active else None,
+        departments=departments,
+    )
 
 
 @router.get("/employees/{employee_id}", response_model=EmployeeResponse)
 async def get_employee(
+    request: Request,
+    response: Response,
     employee_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: ReadConnection = Depends(get_read_connection)
 ):
     """Get employee by ID"""
-    result = await db.execute(
-        select(Employee).where(Employee.id == employee_id)
-    )
-    employee = result.scalar_one_or_none()
-    
-    if not employee:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Employee not found"
+    not_modified = await conditional_response(request, response, db)
+    if not_modified:
+        return not_modified
+
+    async def load():
+        result = await db.execute(
+            select(*RESPONSE_COLUMNS).where(Employee.id == employee_id)
         )
-    
-    return employee
+        employee = result.mappings().one_or_none()
+        
+        if not employee:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Employee not found"
+            )
+        
+        return row_to_response(employee)
+
+    employee = await read_cache(request).get_or_load(cache_key("get_employee", id=employee_id), load)
+    return json_response(employee, response)
 
 
 
@@ -1,10 +1,12 @@
 """
 Health check endpoints
 """
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 from datetime import datetime
-from src.database import check_db_connection
+from src.cache import response_cache
+from src.database import db_monitor, pool_status, replica_router
 from src.config import settings
+from src.metrics import CONTENT_TYPE, registry
 
 router = APIRouter()
 
@@ -27,15 +29,24 @@ async def health_check():
 @router.get("/health/ready", status_code=status.HTTP_200_OK)
 async def readiness_check():
     """
-    Readiness check - includes database connection
+    Readiness check - reports the background database probe.
+
+    Does not touch the connection pool; a probe only runs inline when the
+    monitor has not reported yet (or has stopped reporting).
     """
-    db_connected = await check_db_connection()
+    if db_monitor.stale():
+        await db_monitor.probe()
+    database = db_monitor.status()
+    pool = pool_status()
+    pool_summary = {key: pool[key] for key in ("size", "checked_out", "overflow", "saturation") if key in pool}
     
-    if not db_connected:
+    if not database["healthy"]:
         return {
             "status": "not_ready",
             "timestamp": datetime.utcnow().isoformat(),
-            "database": "disconnected"
+            "database": "disconnected",
+            "database_check": database,
+            "pool": pool_summary
         }
     
     return {
@@ -43,6 +54,9 @@ async def readiness_check():
         "timestamp": datetime.utcnow().isoformat(),
         "service": settings.app_name,
         "database": "connected",
+        "database_check": database,
+        "pool": pool_summary,
+        "replicas": replica_router.status(),
         "environment": settings.environment
     }
 
@@ -58,4 +72,33 @@ async def liveness_check():
     }
 
 
+@router.get("/health/cache", status_code=status.HTTP_200_OK)
+async def cache_stats():
+    """
+    Response cache hit/miss/eviction counters
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "cache": response_cache.stats()
+    }
+
+
+@router.get("/health/pool", status_code=status.HTTP_200_OK)
+async def pool_stats():
+    """
+    Connection pool occupancy, checkout counts and wait times
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "pool": pool_status(),
+        "replicas": replica_router.status(),
+        "primary_reads": replica_router.primary_reads
+    }
+
 
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """
+    Request, database and pool metrics in Prometheus text format
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
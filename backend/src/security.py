@@ -0,0 +1,287 @@
+"""
+Password hashing off the event loop, and signed session tokens
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import bcrypt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwk, jwt
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# bcrypt only uses the first 72 bytes of a password; bcrypt>=5 raises instead
+# of truncating, so truncate explicitly to keep hashes portable across versions
+BCRYPT_MAX_BYTES = 72
+
+
+def _encode(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification in a bounded thread pool.
+
+    bcrypt releases the GIL, so `workers` threads hash in parallel while the
+    event loop keeps serving requests. At most `max_pending` calls are handed
+    to the executor at once; further callers wait on a semaphore instead of
+    growing an unbounded queue. Successful verifications can be remembered for
+    `cache_seconds`, keyed by an HMAC (with a per-process random key) of the
+    stored hash and the password, so repeated logins skip bcrypt and a
+    password change invalidates the entry.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 64,
+                 cache_seconds: float = 0.0, cache_size: int = 10_000):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.cache_seconds = cache_seconds
+        self.cache_size = cache_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._cache_key = os.urandom(32)
+        self._dummy_hash: Optional[bytes] = None
+        self.cache_hits = 0
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._slots_loop = loop
+        async with self._slots:
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(self.rounds)
+        hashed = await self._run(bcrypt.hashpw, _encode(password), salt)
+        return hashed.decode("ascii")
+
+    def _cache_entry(self, password: str, password_hash: str) -> bytes:
+        return hmac.new(self._cache_key, password_hash.encode() + b"\0" + _encode(password), hashlib.sha256).digest()
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        key = None
+        if self.cache_seconds > 0:
+            key = self._cache_entry(password, password_hash)
+            expires = self._cache.get(key)
+            if expires is not None and expires > time.monotonic():
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return True
+        try:
+            valid = await self._run(bcrypt.checkpw, _encode(password), password_hash.encode("ascii"))
+        except ValueError:  # malformed stored hash
+            return False
+        if valid and key is not None:
+            self._cache[key] = time.monotonic() + self.cache_seconds
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return valid
+
+    async def verify_dummy(self, password: str) -> None:
+        """
+        Spend the same bcrypt time as a real verification, so unknown emails
+        cannot be told apart from wrong passwords by response time
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = (await self.hash(os.urandom(16).hex())).encode("ascii")
+        await self._run(bcrypt.checkpw, _encode(password), self._dummy_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when the hash was made with a different work factor than configured"""
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+
+class TokenUser:
+    """
+    Identity carried by a validated access token; no database lookup involved
+    """
+
+    __slots__ = ("id", "email", "name", "role", "jti", "expires")
+
+    def __init__(self, id: int, email: str, name: str, role: str, jti: str, expires: int):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.role = role
+        self.jti = jti
+        self.expires = expires
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"email": self.email, "name": self.name, "role": self.role}
+
+
+class TokenService:
+    """
+    Issue and validate HS256-signed JWT access tokens.
+
+    The signing key is parsed once (python-jose otherwise rebuilds it for
+    every decode), and validated tokens are kept with their claims until
+    they expire, so a repeat request costs one dict lookup. Revoked token
+    ids go on an in-memory denylist until the token would have expired
+    anyway; the denylist is per process, so with several tasks a revoked
+    token stays usable on the others until it expires - keep
+    `access_token_minutes` short.
+    """
+
+    def __init__(self, secret: Optional[str], algorithm: str = "HS256", ttl_seconds: int = 3600,
+                 cache_size: int = 10_000, denylist_size: int = 100_000, require_secret: bool = False):
+        if not secret:
+            # A per-process key only works with a single process: tokens
+            # issued by one task would be rejected by every other
+            if require_secret:
+                raise RuntimeError(
+                    "secret_key is not set. Set `secret_key` (SECRET_KEY) so every task signs and verifies tokens with the same key."
+                )
+            logger.warning("secret_key is not set; signing tokens with a random per-process key")
+            secret = secrets.token_urlsafe(32)
+        self.algorithm = algorithm
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self.denylist_size = denylist_size
+        self._key = jwk.construct(secret, algorithm)
+        self._secret = secret
+        self._validated: "OrderedDict[str, TokenUser]" = OrderedDict()
+        self._denied: "OrderedDict[str, int]" = OrderedDict()
+        self.cache_hits = 0
+
+    def issue(self, user_id: int, email: str, name: str, role: str) -> str:
+        now = int(time.time())
+        claims = {
+            "sub": str(user_id),
+            "email": email,
+            "name": name,
+            "role": role,
+            "iat": now,
+            "exp": now + self.ttl_seconds,
+            "jti": secrets.token_urlsafe(12),
+        }
+        return jwt.encode(claims, self._secret, algorithm=self.algorithm)
+
+    def validate(self, token: str) -> Optional[TokenUser]:
+        """The token's identity, or None if it is malformed, forged, expired or revoked"""
+        now = time.time()
+        user = self._validated.get(token)
+        if user is not None:
+            if user.expires > now and user.jti not in self._denied:
+                self.cache_hits += 1
+                return user
+            del self._validated[token]
+            return None
+
+        try:
+            claims = jwt.decode(token, self._key, algorithms=[self.algorithm],
+                                options={"require_exp": True, "require_sub": True, "require_jti": True})
+            user = TokenUser(int(claims["sub"]), claims["email"], claims["name"], claims["role"],
+                             claims["jti"], int(claims["exp"]))
+        except (JWTError, KeyError, ValueError, TypeError):
+            return None
+        if user.jti in self._denied:
+            return None
+
+        self._validated[token] = user
+        if len(self._validated) > self.cache_size:
+            self._validated.popitem(last=False)
+        return user
+
+    def revoke(self, user: TokenUser) -> None:
+        """Deny the token until it expires"""
+        now = time.time()
+        self._denied[user.jti] = user.expires
+        # Entries are added with roughly increasing expiry, so expired ones sit at the front
+        while self._denied:
+            jti, expires = next(iter(self._denied.items()))
+            if expires > now and len(self._denied) <= self.denylist_size:
+                break
+            self._denied.popitem(last=False)
+
+    def clear(self) -> None:
+        self._validated.clear()
+        self._denied.clear()
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    workers=settings.auth_hash_workers,
+    max_pending=settings.auth_max_pending,
+    cache_seconds=settings.auth_verify_cache_seconds,
+    cache_size=settings.auth_verify_cache_size,
+)
+
+token_service = TokenService(
+    settings.secret_key,
+    algorithm=settings.jwt_algorithm,
+    ttl_seconds=settings.access_token_minutes * 60,
+    cache_size=settings.token_cache_size,
+    require_secret=settings.environment != "dev",
+)
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> Optional[TokenUser]:
+    """
+    Identity from the Authorization: Bearer token, validated in-process.
+
+    A missing token is allowed (None) unless `auth_required` is set; a
+    token that is present must be valid either way.
+    """
+    if credentials is None:
+        if settings.auth_required:
+            raise _unauthorized("Not authenticated")
+        return None
+    user = token_service.validate(credentials.credentials)
+    if user is None:
+        raise _unauthorized("Invalid or expired token")
+    return user
+
+
+def require_role(*roles: str):
+    """
+    Dependency allowing only tokens with one of `roles`. Always requires a
+    token, even when `auth_required` is off, so leaving the header out
+    cannot get around the role check.
+    """
+
+    async def check(user: Optional[TokenUser] = Depends(get_current_user)) -> TokenUser:
+        if user is None:
+            raise _unauthorized("Not authenticated")
+        if user.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+        return user
+
+    return check
@@ -1,10 +1,43 @@
 """
 Logging configuration for CloudWatch
 """
+import atexit
+import contextvars
 import logging
 import json
-from datetime import datetime
-from typing import Any, Dict
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Sampled per-request diagnostics (see debug_sampled). Records carry a
+# structured `debug` field and are emitted whatever the root log level is.
+request_debug_logger = logging.getLogger("request_debug")
+request_debug_logger.setLevel(logging.DEBUG)
+
+# Fields of the request being handled, stamped onto every record logged
+# while handling it (see RequestContextFilter)
+request_context: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "request_context", default=None
+)
+
+# Optional record attributes copied into the JSON output
+EXTRA_FIELDS = ("request_id", "user_id", "method", "route", "status_code", "latency_ms", "debug")
+
+_stdlib_encode = json.JSONEncoder(default=str, separators=(",", ":")).encode
+
+
+def encode_json(data: Dict[str, Any]) -> str:
+    """Compact JSON with orjson when available, else a reused stdlib encoder"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode()
+    return _stdlib_encode(data)
 
 
 class CloudWatchFormatter(logging.Formatter):
@@ -12,40 +45,223 @@ class CloudWatchFormatter(logging.Formatter):
     Custom formatter for CloudWatch logs
     Outputs structured JSON logs
     """
-    
+
     def format(self, record: logging.LogRecord) -> str:
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Event time, not format time: records are formatted later on the listener thread
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).replace(tzinfo=None).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
-        
-        # Add exception info if present
+
+        # Add exception info if present (pre-rendered by QueuedHandler.prepare)
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
-        
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
+
         # Add extra fields
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
-        
-        if hasattr(record, "user_id"):
-            log_data["user_id"] = record.user_id
-        
-        return json.dumps(log_data)
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                log_data[field] = value
+
+        return encode_json(log_data)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Copy the current request's fields (request_id, route, ...) onto records
+    """
 
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if context:
+            for key, value in context.items():
+                if not hasattr(record, key):
+                    setattr(record, key, value)
+        return True
 
-def setup_logging(log_level: str = "INFO") -> None:
+
+class QueuedHandler(QueueHandler):
     """
-    Setup logging configuration
+    Non-blocking handler: records go onto a bounded queue for the listener thread.
+
+    When the queue is full the record is dropped rather than blocking the
+    caller. `drop_policy` "newest" drops the incoming record, "oldest" evicts
+    the oldest queued one to make room. Drops are counted in `dropped`.
     """
-    handler = logging.StreamHandler()
-    handler.setFormatter(CloudWatchFormatter())
-    
-    logging.basicConfig(
-        level=getattr(logging, log_level),
-        handlers=[handler]
-    )
 
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = "newest"):
+        super().__init__(log_queue)
+        if drop_policy not in ("newest", "oldest"):
+            raise ValueError(f"Unknown log drop policy {drop_policy!r}")
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self.addFilter(RequestContextFilter())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now, while args and exc_info are
+        # still valid, but leave JSON formatting to the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.drop_policy == "oldest":
+                try:
+                    self.queue.get_nowait()
+                    self.queue.put_nowait(record)
+                except (queue.Empty, queue.Full):
+                    pass
+            self.dropped += 1
+
+
+class BatchStreamHandler(logging.StreamHandler):
+    """
+    Stream handler that writes a batch of records with one write and one flush
+    """
+
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        with self.lock:
+            try:
+                self.stream.write(self.terminator.join(lines) + self.terminator)
+                self.flush()
+            except Exception:
+                self.handleError(records[0])
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    Queue listener that drains up to `batch_size` records per wakeup and
+    hands them to handlers as one batch, and reports dropped records.
+    """
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler,
+                 batch_size: int = 100, source: Optional[QueuedHandler] = None):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.source = source
+        self._reported_drops = 0
+
+    def enqueue_sentinel(self) -> None:
+        # Block rather than drop: the listener is still draining the queue
+        self.queue.put(self._sentinel)
+
+    def _monitor(self) -> None:
+        stopping = False
+        while not stopping:
+            record = self.dequeue(True)
+            batch = []
+            while True:
+                if record is self._sentinel:
+                    stopping = True
+                    break
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.dequeue(False)
+                except queue.Empty:
+                    break
+            self._report_drops(batch)
+            if batch:
+                self.handle_batch(batch)
+
+    def _report_drops(self, batch: List[logging.LogRecord]) -> None:
+        if self.source is None or self.source.dropped == self._reported_drops:
+            return
+        dropped = self.source.dropped - self._reported_drops
+        self._reported_drops = self.source.dropped
+        batch.append(logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            f"Log queue full: dropped {dropped} records", None, None,
+        ))
+
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            accepted = [r for r in records if r.levelno >= handler.level]
+            if not accepted:
+                continue
+            if isinstance(handler, BatchStreamHandler):
+                handler.emit_batch(accepted)
+            else:
+                for record in accepted:
+                    handler.handle(record)
+
+
+_listener: Optional[BatchingQueueListener] = None
+_queue_handler: Optional[QueuedHandler] = None
+
+
+def debug_sampled(rate: float) -> bool:
+    """
+    Whether to emit request diagnostics for this request. `rate` is the
+    sampled fraction (0 disables, 1 logs every request); when disabled this
+    is a single comparison, so guarded debug code costs nothing.
+    """
+    return rate > 0 and (rate >= 1 or random.random() < rate)
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    queue_size: int = 10_000,
+    batch_size: int = 100,
+    drop_policy: str = "newest",
+    stream: Any = None,
+) -> QueuedHandler:
+    """
+    Setup logging configuration.
+
+    The root logger gets a QueuedHandler, so logging calls only enqueue;
+    a background listener formats records as CloudWatch JSON and writes
+    them in batches to `stream` (stderr by default). Calling it again
+    replaces the previous pipeline.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    output = BatchStreamHandler(stream)
+    output.setFormatter(CloudWatchFormatter())
+    _queue_handler = QueuedHandler(log_queue, drop_policy=drop_policy)
+    _listener = BatchingQueueListener(log_queue, output, batch_size=batch_size, source=_queue_handler)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(getattr(logging, log_level))
+    return _queue_handler
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the listener thread
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
 
 
+atexit.register(shutdown_logging)
@@ -6,5 +6,6 @@ set db_host=localhost
 set db_port=5432
 set db_name=hrdb
 set environment=dev
+set auth_seed_test_users=true
 python -m uvicorn src.main:app --host 127.0.0.1 --port 8000
 pause
@@ -0,0 +1,306 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+os.environ.setdefault("DB_USERNAME", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from src.cache import MemoryCacheBackend, RedisCacheBackend, RedisPool, ResponseCache, cache_key, estimate_size
+from src.responses import dumps
+
+
+def test_cache_key_is_order_independent():
+    """Cache keys ignore parameter order and unset parameters"""
+    assert cache_key("r", a=1, b=None, c="x") == cache_key("r", c="x", a=1) == "r?a=1&c=x"
+
+
+def test_lru_eviction_and_ttl_expiry():
+    """Least recently used entries are evicted and expired entries reloaded"""
+    cache = ResponseCache(MemoryCacheBackend(maxsize=2, ttl=60))
+    calls = []
+
+    def loader(value):
+        async def load():
+            calls.append(value)
+            return value
+        return load
+
+    async def run():
+        await cache.get_or_load("a", loader("a"))
+        await cache.get_or_load("b", loader("b"))
+        await cache.get_or_load("a", loader("a"))  # a is now most recent
+        await cache.get_or_load("c", loader("c"))  # evicts b
+        await cache.get_or_load("b", loader("b"))
+        cache.backend.ttl = 0
+        await cache.get_or_load("x", loader("x"))
+        await cache.get_or_load("x", loader("x"))
+
+    asyncio.run(run())
+    assert calls == ["a", "b", "c", "b", "x", "x"]
+    assert cache.hits == 1
+    assert cache.backend.evictions >= 3
+
+
+def test_memory_backend_is_bounded_by_estimated_size():
+    """Large pages evict older entries by size, and oversized values are not stored"""
+    page = [{"id": i, "email": f"user{i}@blackflag.hr", "first_name": "First"} for i in range(1000)]
+    backend = MemoryCacheBackend(maxsize=100, ttl=60, max_bytes=estimate_size(page) * 9 // 2)
+
+    async def run():
+        for key in ("a", "b", "c", "d", "e"):
+            await backend.set(key, page)
+        await backend.set("huge", page * 2)
+        return [(await backend.get(key))[0] for key in ("a", "b", "c", "d", "e", "huge")]
+
+    assert asyncio.run(run()) == [False, True, True, True, True, False]
+    assert backend.size == 4 * estimate_size(page) <= backend.max_bytes
+
+
+def test_concurrent_misses_are_coalesced():
+    """Concurrent misses for one key run the loader once"""
+    cache = ResponseCache(MemoryCacheBackend())
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"rows": calls}
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("k", load) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert calls == 1
+    assert all(r == {"rows": 1} for r in results)
+    assert cache.coalesced == 9
+
+
+def test_failed_load_is_not_cached_and_invalidation_wins():
+    """Loader errors propagate to all waiters; loads racing a write are not stored"""
+    cache = ResponseCache(MemoryCacheBackend())
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("db down")
+
+    async def slow():
+        await asyncio.sleep(0.01)
+        return "stale"
+
+    async def run():
+        results = await asyncio.gather(
+            cache.get_or_load("k", fail), cache.get_or_load("k", fail), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+        task = asyncio.ensure_future(cache.get_or_load("s", slow))
+        await asyncio.sleep(0)
+        await cache.invalidate()
+        assert await task == "stale"
+
+    asyncio.run(run())
+    assert cache.stats()["entries"] == 0
+
+
+class FakeRedisServer:
+    """Just enough of the Redis protocol to exercise RedisCacheBackend locally"""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.delay = 0.0
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        for writers in self.subscribers.values():
+            for writer in writers:
+                writer.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    def _bulk(value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readuntil(b"\r\n")
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readuntil(b"\r\n"))[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(self._dispatch(args, writer))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    def _dispatch(self, args, writer):
+        command = args[0].upper()
+        if command == b"GET":
+            value, expires_at = self.data.get(args[1], (None, None))
+            if expires_at is not None and expires_at <= time.monotonic():
+                value = None
+            return self._bulk(value)
+        if command == b"SET":
+            expires_at = None
+            if len(args) == 5 and args[3].upper() == b"PX":
+                expires_at = time.monotonic() + int(args[4]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"INCR":
+            value = int(self.data.get(args[1], (b"0", None))[0]) + 1
+            self.data[args[1]] = (str(value).encode(), None)
+            return b":%d\r\n" % value
+        if command == b"PUBLISH":
+            receivers = self.subscribers.get(args[1], [])
+            message = b"*3\r\n" + self._bulk(b"message") + self._bulk(args[1]) + self._bulk(args[2])
+            for receiver in receivers:
+                receiver.write(message)
+            return b":%d\r\n" % len(receivers)
+        if command == b"SUBSCRIBE":
+            self.subscribers.setdefault(args[1], []).append(writer)
+            return b"*3\r\n" + self._bulk(b"subscribe") + self._bulk(args[1]) + b":1\r\n"
+        return b"-ERR unknown command\r\n"
+
+
+def test_redis_backend_shares_entries_and_broadcasts_invalidation():
+    """Two tasks share cached entries and both drop them when either writes"""
+    async def run():
+        server = FakeRedisServer()
+        await server.start()
+        url = f"redis://127.0.0.1:{server.port}/0"
+        task_a = ResponseCache(RedisCacheBackend(url, ttl=60))
+        task_b = ResponseCache(RedisCacheBackend(url, ttl=60))
+        await task_a.start()
+        await task_b.start()
+        await asyncio.sleep(0.05)  # let subscriptions register
+
+        async def load_v1():
+            return {"rows": [{"hire_date": datetime(2024, 1, 1)}]}
+
+        async def load_v2():
+            return {"rows": []}
+
+        try:
+            await task_a.get_or_load("k", load_v1)
+            assert await task_b.get_or_load("k", load_v2) == {"rows": [{"hire_date": "2024-01-01T00:00:00"}]}
+            assert task_b.hits == 1
+
+            # A hit read back from Redis encodes exactly like the fresh value
+            row = {"hire_date": datetime(2024, 1, 1, 9, 30, tzinfo=timezone.utc)}
+
+            async def load_aware():
+                return [row]
+
+            fresh = await task_a.get_or_load("aware", load_aware)
+            cached = await task_b.get_or_load("aware", load_aware)
+            assert cached == [{"hire_date": "2024-01-01T09:30:00Z"}]
+            assert dumps(cached) == dumps(fresh)
+
+            await task_a.invalidate()
+            for _ in range(50):
+                if task_b.backend.generation == task_a.backend.generation:
+                    break
+                await asyncio.sleep(0.01)
+            assert await task_b.get_or_load("k", load_v2) == {"rows": []}
+        finally:
+            await task_a.close()
+            await task_b.close()
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_redis_cancelled_command_does_not_leak_its_reply():
+    """A command cancelled before its reply arrives cannot hand that reply to the next command"""
+    async def run():
+        server = FakeRedisServer()
+        await server.start()
+        server.data = {b"a": (b"AAA", None), b"b": (b"BBB", None)}
+        pool = RedisPool(f"redis://127.0.0.1:{server.port}/0", size=1)
+        try:
+            server.delay = 0.1
+            pending = asyncio.create_task(pool.execute("GET", "a"))
+            await asyncio.sleep(0.03)
+            pending.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await pending
+            server.delay = 0.0
+            assert await pool.execute("GET", "b") == b"BBB"
+            assert await asyncio.gather(*(pool.execute("GET", key) for key in "ab")) == [b"AAA", b"BBB"]
+        finally:
+            await pool.close()
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_redis_backend_degrades_to_misses_when_unreachable():
+    """An unreachable Redis turns reads into plain loads instead of errors"""
+    async def run():
+        cache = ResponseCache(RedisCacheBackend("redis://127.0.0.1:1/0", timeout=0.2))
+        await cache.start()
+
+        async def load():
+            return "fresh"
+
+        try:
+            assert await cache.get_or_load("k", load) == "fresh"
+            # The failed startup GET marked Redis down, so GET and SET were skipped
+            assert cache.backend.skipped == 2
+            await cache.invalidate()
+            assert cache.backend.errors == 1
+            assert cache.stats()["healthy"] is False
+        finally:
+            await cache.close()
+
+    asyncio.run(run())
+
+
+def test_redis_backend_skips_an_unresponsive_server_until_retry():
+    """After one timeout, lookups miss immediately instead of each waiting it out"""
+    async def run():
+        server = FakeRedisServer()
+        await server.start()
+        server.delay = 10.0
+        backend = RedisCacheBackend(f"redis://127.0.0.1:{server.port}/0", timeout=0.2, retry_seconds=0.5)
+        try:
+            assert await backend.get("k") == (False, None)
+            assert backend.errors == 1
+
+            started = time.monotonic()
+            for _ in range(10):
+                assert await backend.get("k") == (False, None)
+                await backend.set("k", "v")
+            assert time.monotonic() - started < 0.1
+            assert backend.skipped == 20
+
+            # Once the retry window passes Redis is tried again
+            server.delay = 0.0
+            server.data = {b"hrcache:0:k": (b'"cached"', None)}
+            await asyncio.sleep(0.5)
+            assert await backend.get("k") == (True, "cached")
+        finally:
+            await backend.close()
+            await server.stop()
+
+    asyncio.run(run())
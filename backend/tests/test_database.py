@@ -0,0 +1,207 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+os.environ.setdefault("DB_USERNAME", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from sqlalchemy import exc, text
+
+from src import database
+from src.config import settings
+
+
+def test_engine_options_profiles_and_overrides(monkeypatch):
+    """Profiles supply defaults and explicit db_* settings win"""
+    assert database.engine_options("import")["pool_size"] == 1
+
+    monkeypatch.setattr(settings, "db_pool_size", 42)
+    monkeypatch.setattr(settings, "db_pool_pre_ping", True)
+    monkeypatch.setattr(settings, "db_echo", False)
+    options = database.engine_options("api")
+    assert options["pool_size"] == 42
+    assert options["pool_pre_ping"] is True
+    assert options["max_overflow"] == database.ENGINE_PROFILES["api"]["max_overflow"]
+    assert options["echo"] is False
+
+    with pytest.raises(RuntimeError):
+        database.engine_options("batch")
+
+
+def test_pool_metrics_record_checkouts_and_timeouts(tmp_path, monkeypatch):
+    """Checkouts are timed and exhausted pools count timeouts"""
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    monkeypatch.setattr(settings, "db_pool_timeout", 0.05)
+    monkeypatch.setattr(settings, "db_echo", False)
+    engine = database.create_engine_for("api", url=f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    database.pool_metrics.reset()
+
+    async def run():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        await engine.dispose()
+
+    asyncio.run(run())
+    snapshot = database.pool_metrics.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checkins"] == 1
+    assert sum(snapshot["wait_histogram"].values()) == 1
+
+
+def test_create_missing_indexes_backfills_existing_tables(tmp_path):
+    """Indexes declared after a table was created are added on the next init"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from src import models  # noqa: F401
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'indexes.db'}")
+
+    async def index_names(conn):
+        result = await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))
+        return {name for (name,) in result}
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+            declared = await index_names(conn)
+            await conn.execute(text("DROP INDEX ix_employees_updated_at"))
+            await conn.execute(text("DROP INDEX ix_employees_lower_email"))
+            await conn.run_sync(database.Base.metadata.create_all)
+            assert "ix_employees_updated_at" not in await index_names(conn)
+            await conn.run_sync(database.create_missing_indexes)
+            await conn.run_sync(database.create_missing_indexes)
+            restored = await index_names(conn)
+        await engine.dispose()
+        return declared, restored
+
+    declared, restored = asyncio.run(run())
+    assert "ix_employees_updated_at" in declared
+    assert restored == declared
+
+
+def test_replica_routing_round_robin_failover_and_stickiness(tmp_path, monkeypatch):
+    """Reads rotate over healthy replicas, skip failed ones and fall back to the primary"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from starlette.requests import Request
+
+    monkeypatch.setattr(settings, "db_echo", False)
+    urls = {name: f"sqlite+aiosqlite:///{tmp_path / name}.db" for name in ("primary", "r1", "r2")}
+    primary = create_async_engine(urls["primary"])
+    monkeypatch.setattr(database, "engine", primary)
+    router = database.ReplicaRouter(
+        [urls["r1"], f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'r3.db'}", urls["r2"]],
+        retry_seconds=60,
+    )
+    monkeypatch.setattr(database, "replica_router", router)
+    pinned_request = Request({"type": "http", "headers": [
+        (database.READ_PRIMARY_HEADER.lower().encode(), database.read_primary_token(time.time() + 5).encode()),
+    ]})
+
+    async def served_by(conn):
+        try:
+            return (await conn.execute(text("SELECT name FROM marker"))).scalar_one()
+        finally:
+            await conn.close()
+
+    async def served_by_dependency(request):
+        dependency = database.get_read_connection(request)
+        conn = await dependency.__anext__()
+        try:
+            return (await conn.execute(text("SELECT name FROM marker"))).scalar_one()
+        finally:
+            await dependency.aclose()
+
+    async def run():
+        for name, url in urls.items():
+            engine = create_async_engine(url)
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE TABLE marker (name TEXT)"))
+                await conn.execute(text("INSERT INTO marker VALUES (:n)"), {"n": name})
+            await engine.dispose()
+
+        served = [await served_by(await router.open_connection()) for _ in range(4)]
+        pinned = await served_by(await router.open_connection(use_primary=True))
+        via_dependency = await served_by_dependency(Request({"type": "http", "headers": []}))
+        pinned_via_dependency = await served_by_dependency(pinned_request)
+        for replica in router.replicas:
+            replica.down_until = float("inf")
+        fallback = await served_by(await router.open_connection())
+        await router.dispose()
+        await primary.dispose()
+        return served, pinned, via_dependency, pinned_via_dependency, fallback
+
+    served, pinned, via_dependency, pinned_via_dependency, fallback = asyncio.run(run())
+    assert served == ["r1", "r2", "r2", "r1"]  # r3 fails once and is skipped afterwards
+    assert via_dependency == "r2"
+    assert pinned == pinned_via_dependency == fallback == "primary"
+    assert [r["healthy"] for r in router.status()] == [False, False, False]
+    assert router.replicas[1].last_error
+    assert router.primary_reads == 3
+
+    def header(value: bytes) -> Request:
+        return Request({"type": "http", "headers": [(database.READ_PRIMARY_HEADER.lower().encode(), value)]})
+
+    soon = database.read_primary_token(time.time() + 1).encode()
+    cookie = Request({"type": "http", "headers": [(b"cookie", database.READ_PRIMARY_COOKIE.encode() + b"=" + soon)]})
+    assert database.reads_pinned_to_primary(cookie) and database.reads_pinned_to_primary(header(soon))
+    assert not database.reads_pinned_to_primary(Request({"type": "http", "headers": []}))
+    # Only deadlines signed by remember_write count, so clients cannot pin themselves
+    assert not database.reads_pinned_to_primary(header(f"{time.time() + 1:.3f}".encode()))
+    tampered = soon[:-1] + (b"1" if soon.endswith(b"0") else b"0")
+    assert not database.reads_pinned_to_primary(header(tampered))
+    assert not database.reads_pinned_to_primary(header("é".encode("latin-1")))
+    assert not database.reads_pinned_to_primary(header(database.read_primary_token(time.time() + 3600).encode()))
+    # Without replicas every read sees the primary, so the header is ignored
+    monkeypatch.setattr(router, "replicas", [])
+    assert not database.reads_pinned_to_primary(header(soon))
+
+
+def test_health_monitor_caches_probe_results_for_readiness(tmp_path, monkeypatch):
+    """Readiness serves the monitor's cached probe; failures are reported with their error"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from src.routes import health
+
+    monitor = database.DbHealthMonitor(interval=0.05, timeout=1.0)
+    monkeypatch.setattr(database, "engine", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ok.db'}"))
+    monkeypatch.setattr(health, "db_monitor", monitor)
+
+    async def run_loop():
+        monitor.start()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+
+    asyncio.run(run_loop())
+    assert monitor.probes >= 2 and monitor.healthy
+    assert monitor.status()["last_success_age_seconds"] is not None
+
+    app = FastAPI()
+    app.include_router(health.router)
+    monitor.interval = 60
+    asyncio.run(monitor.probe())
+    probes = monitor.probes
+    with TestClient(app) as client:
+        ready = [client.get("/health/ready").json() for _ in range(3)]
+    assert monitor.probes == probes  # served from the cached result
+    assert ready[-1]["status"] == "ready"
+    assert ready[-1]["database_check"]["latency_ms"] >= 0
+
+    monkeypatch.setattr(database, "engine", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'db.db'}"))
+    assert asyncio.run(monitor.probe()) is False
+    with TestClient(app) as client:
+        body = client.get("/health/ready").json()
+    assert body["status"] == "not_ready"
+    assert body["database_check"]["consecutive_failures"] == 1
+    assert body["database_check"]["last_error"]
@@ -0,0 +1,241 @@
+import sys
+from pathlib import Path
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root / "scripts"))
+
+import import_test_db as importer
+
+
+def test_tokenizer_handles_quotes_escapes_and_null():
+    """Tuples are split correctly even when strings contain commas, parens and escapes"""
+    stmt = (
+        "INSERT INTO `employees` VALUES (10001,'1953-09-02','Georgi','Facello','M','1986-06-26'),\n"
+        "(10002,'1964-06-02','O''Neil','it\\'s (a, b)','F',NULL),"
+        "(10003,'1959-12-03','Back\\\\slash','Tab\\tbed','M','1986-08-28');\n"
+    )
+    rows = list(importer.iter_tuples_from_insert(stmt))
+    assert rows == [
+        ["10001", "1953-09-02", "Georgi", "Facello", "M", "1986-06-26"],
+        ["10002", "1964-06-02", "O'Neil", "it's (a, b)", "F", None],
+        ["10003", "1959-12-03", "Back\\slash", "Tab\tbed", "M", "1986-08-28"],
+    ]
+
+
+def test_stream_inserts_joins_multiline_statements(tmp_path):
+    """Statements spanning lines are yielded whole"""
+    dump = tmp_path / "load_titles.dump"
+    dump.write_text(
+        "INSERT INTO `titles` VALUES (10001,'Senior Engineer','1986-06-26','9999-01-01'),\n"
+        "(10002,'Staff','1996-08-03','9999-01-01');\n"
+        "INSERT INTO `titles` VALUES (10003,'Engineer','1995-12-03','9999-01-01');\n"
+    )
+    statements = list(importer.stream_inserts_from_file(dump))
+    assert len(statements) == 2
+    assert dict(importer.build_title_latest(dump).items()) == {
+        "10001": "Senior Engineer", "10002": "Staff", "10003": "Engineer",
+    }
+
+
+def test_copy_stream_renders_copy_text_in_chunks():
+    """CopyStream emits escaped COPY text lines regardless of read size"""
+    rows = [
+        ("1", "a@example.local", "Ann", "Tab\there", None, None, None, None, True, "1986-06-26", "1986-06-26"),
+        ("2", "b@example.local", "Bo", "Back\\slash", "Sales", "Staff", None, None, False, None, "2000-01-01"),
+    ]
+    stream = importer.CopyStream(rows)
+    chunks = []
+    while True:
+        chunk = stream.read(7)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    assert "".join(chunks) == (
+        "1\ta@example.local\tAnn\tTab\\there\t\\N\t\\N\t\\N\t\\N\tt\t1986-06-26\t1986-06-26\n"
+        "2\tb@example.local\tBo\tBack\\\\slash\tSales\tStaff\t\\N\t\\N\tf\t\\N\t2000-01-01\n"
+    )
+    assert stream.count == 2
+
+
+def write_dataset(path, employees=3000):
+    """Write a small test_db-shaped dataset with multi-row, multi-line INSERT statements"""
+    def dump(name, table, rows, per_stmt=250):
+        with open(path / name, "w") as f:
+            for i in range(0, len(rows), per_stmt):
+                f.write(f"INSERT INTO `{table}` VALUES " + ",\n".join(rows[i:i + per_stmt]) + ";\n")
+
+    depts = [f"d00{i}" for i in range(1, 6)]
+    dump("load_departments.dump", "departments", [f"('{d}','Dept {d}')" for d in depts])
+    dump("load_employees.dump", "employees", [
+        f"({10000 + i},'1960-01-01','First{i}','Last''{i}','M','19{80 + i % 20}-01-01')" for i in range(employees)
+    ])
+    dept_emp = []
+    titles = []
+    for i in range(employees):
+        emp = 10000 + i
+        dept_emp.append(f"({emp},'{depts[i % 5]}','1985-01-01','1990-01-01')")
+        dept_emp.append(f"({emp},'{depts[(i + 1) % 5]}','1990-01-01','9999-01-01')")
+        titles.append(f"({emp},'Engineer','1985-01-01','1995-01-01')")
+        titles.append(f"({emp},'{'Senior Engineer' if i % 3 else 'Staff'}','1995-01-01','9999-01-01')")
+    dump("load_dept_emp.dump", "dept_emp", dept_emp)
+    dump("load_titles.dump", "titles", titles)
+
+
+def test_statement_ranges_cover_file_on_boundaries(tmp_path):
+    """Byte ranges tile the file and each starts with a complete statement"""
+    write_dataset(tmp_path)
+    path = tmp_path / "load_dept_emp.dump"
+    ranges = importer.split_statement_ranges(path, 4)
+    assert len(ranges) == 4
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    ranged = [stmt for a, b in ranges for stmt in importer.stream_inserts_from_file(path, a, b)]
+    assert ranged == list(importer.stream_inserts_from_file(path))
+
+
+def test_parallel_rows_match_serial(tmp_path):
+    """--workers produces exactly the serial row sequence"""
+    write_dataset(tmp_path)
+    def rows(batches):
+        return [row for _, _, batch in batches for row in batch]
+
+    serial = rows(importer.serial_employee_batches(tmp_path, importer.PhaseStats()))
+    parallel = rows(importer.parallel_employee_batches(tmp_path, 3, importer.PhaseStats()))
+    assert len(serial) == 3000
+    assert parallel == serial
+    assert serial[1][3] == "Last'1"
+    assert serial[1][4:6] == ("Dept d003", "Senior Engineer")
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def execute(self, sql):
+        if sql.startswith("INSERT INTO employees"):
+            self.rowcount = len(self.conn.staged)
+            self.conn.pending.extend(self.conn.staged)
+        elif "CREATE TEMP TABLE" in sql:
+            self.conn.staged = []
+
+    def copy_expert(self, sql, stream, size):
+        data = ""
+        while True:
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            data += chunk
+        self.conn.staged = [line.split("\t")[0] for line in data.splitlines()]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Stands in for psycopg2: records committed employee_ids, optionally failing a commit"""
+
+    def __init__(self, committed, fail_on_commit=None):
+        self.committed = committed
+        self.fail_on_commit = fail_on_commit
+        self.commits = 0
+        self.staged = []
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        if self.commits == self.fail_on_commit:
+            raise RuntimeError("connection lost")
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+def run_import(monkeypatch, path, committed, fail_on_commit=None, **flags):
+    import argparse
+
+    connections = []
+
+    def connect(dsn):
+        connections.append(FakeConnection(committed, fail_on_commit))
+        return connections[-1]
+
+    monkeypatch.setattr(importer.psycopg2, "connect", connect)
+    args = argparse.Namespace(
+        path=str(path), host="h", port="5432", user="u", password="", database="d",
+        benchmark=False, workers=1, commit_rows=500, state_file=None, resume=False, incremental=False,
+    )
+    for name, value in flags.items():
+        setattr(args, name, value)
+    importer.import_to_postgres(args)
+    return connections
+
+
+def test_resume_continues_after_last_committed_segment(tmp_path, monkeypatch):
+    """A run that dies mid-file resumes from its checkpoint without resending committed rows"""
+    import json
+    import pytest
+
+    write_dataset(tmp_path)
+    committed = []
+    with pytest.raises(RuntimeError):
+        run_import(monkeypatch, tmp_path, committed, fail_on_commit=3)
+    assert len(committed) == 1000
+    checkpoint = json.loads((tmp_path / ".import_state.json").read_text())["checkpoint"]
+    assert checkpoint["rows"] == 1000 and checkpoint["statement_index"] == 4
+
+    run_import(monkeypatch, tmp_path, committed, resume=True)
+    assert committed == [str(10000 + i) for i in range(3000)]
+    assert "checkpoint" not in json.loads((tmp_path / ".import_state.json").read_text())
+
+
+def test_incremental_skips_unchanged_sources(tmp_path, monkeypatch):
+    """--incremental does nothing when no dump changed and reimports when one did"""
+    write_dataset(tmp_path)
+    committed = []
+    run_import(monkeypatch, tmp_path, committed, incremental=True)
+    assert len(committed) == 3000
+
+    assert run_import(monkeypatch, tmp_path, committed, incremental=True) == []
+
+    with open(tmp_path / "load_titles.dump", "a") as f:
+        f.write("INSERT INTO `titles` VALUES (10000,'Manager','2000-01-01','9999-01-01');\n")
+    assert len(run_import(monkeypatch, tmp_path, committed, incremental=True)) == 1
+
+
+def test_code_map_matches_dict_semantics():
+    """CodeMap behaves like the dict it replaces, including non-integer keys and merges"""
+    first = importer.CodeMap()
+    first["10001"] = "Staff"
+    first["10002"] = "Engineer"
+    first["10001"] = "Senior Staff"
+    first["x-1"] = "Manager"
+    second = importer.CodeMap()
+    second["10002"] = None
+    second["10003"] = "Staff"
+
+    first.update(second)
+    assert dict(first.items()) == {"10001": "Senior Staff", "10002": None, "10003": "Staff", "x-1": "Manager"}
+    assert len(first) == 4
+    assert first.get("10004") is None and first.get("010001", "missing") == "missing"
+
+
+def test_build_latest_map_prefers_current_then_latest_row(tmp_path):
+    """Current rows win; otherwise the most recent dated row is kept"""
+    dump = tmp_path / "load_titles.dump"
+    dump.write_text(
+        "INSERT INTO `titles` VALUES (1,'Staff','1990-01-01','1995-01-01'),(1,'Engineer','1995-01-01','9999-01-01'),"
+        "(1,'Manager','2000-01-01','9999-01-01'),(2,'Staff','1990-01-01','1995-01-01'),"
+        "(2,'Senior Staff','1995-01-01','2001-01-01');\n"
+    )
+    latest = importer.build_latest_map_from_dump(dump, to_date_index=3)
+    assert latest["1"][1] == "Engineer"
+    assert latest["2"][1] == "Senior Staff"
@@ -1,6 +1,9 @@
 import os
 import sys
 import asyncio
+import base64
+import time
+from datetime import timedelta
 from pathlib import Path
 
 # Add backend root to path so src module can be imported
@@ -15,7 +18,12 @@ os.environ.setdefault("DB_USERNAME", "test")
 os.environ.setdefault("DB_PASSWORD", "test")
 
 import src.database as database
+from src.cache import response_cache
 from src.models import Employee
+from src.security import password_hasher
+
+# Minimum bcrypt work factor keeps seeding and logins fast in tests
+password_hasher.rounds = 4
 
 
 TEST_DB_URL = "sqlite+aiosqlite:///:memory:"
@@ -39,6 +47,8 @@ async def seed_employees(async_session_maker):
 
 def setup_test_env():
     """Setup in-memory test environment"""
+    from src.routes import auth
+
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
@@ -47,13 +57,23 @@ def setup_test_env():
 
     database.engine = engine
     database.AsyncSessionLocal = async_session_maker
+    loop.run_until_complete(response_cache.invalidate())
 
     loop.run_until_complete(setup_in_memory_db(engine))
     loop.run_until_complete(seed_employees(async_session_maker))
+    loop.run_until_complete(auth.seed_test_users())
     
     return loop, async_session_maker
 
 
+def admin_headers():
+    """Authorization header for an hr_admin, as issued by /auth/login"""
+    from src.security import token_service
+
+    token = token_service.issue(1, "sarah.chen@blackflag.hr", "Sarah Chen", "hr_admin")
+    return {"Authorization": f"Bearer {token}"}
+
+
 def get_test_app(async_session_maker):
     """Create test FastAPI app with in-memory DB"""
     from fastapi import FastAPI
@@ -108,6 +128,7 @@ def test_employees_list_endpoint():
 
 def test_auth_login_valid_credentials():
     """Test 3: POST /api/v1/auth/login authenticates with valid credentials"""
+    setup_test_env()
     from fastapi import FastAPI
     from fastapi.testclient import TestClient
     from src.routes import auth
@@ -130,6 +151,7 @@ def test_auth_login_valid_credentials():
 
 def test_auth_login_invalid_credentials():
     """Test 4: POST /api/v1/auth/login rejects invalid credentials"""
+    setup_test_env()
     from fastapi import FastAPI
     from fastapi.testclient import TestClient
     from src.routes import auth
@@ -170,6 +192,16 @@ def test_health_check_endpoints():
         r = client.get("/health/ready")
         assert r.status_code == 200
         assert "status" in r.json()
+        
+        # Cache counters
+        r = client.get("/health/cache")
+        assert r.status_code == 200
+        assert "hits" in r.json()["cache"]
+        
+        # Pool counters
+        r = client.get("/health/pool")
+        assert r.status_code == 200
+        assert "checkouts" in r.json()["pool"]["metrics"]
 
 
 def test_api_integration_complete_flow():
@@ -193,3 +225,620 @@ def test_api_integration_complete_flow():
         r2 = client.get("/employees?skip=0&limit=1")
         assert r2.status_code == 200
         assert len(r2.json()) == 1
+
+
+def test_employees_cursor_pagination():
+    """Test 7: GET /employees walks pages with the keyset cursor"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        r1 = client.get("/employees?limit=1")
+        assert r1.status_code == 200
+        cursor = r1.headers["X-Next-Cursor"]
+
+        r2 = client.get(f"/employees?limit=1&after={cursor}")
+        assert r2.status_code == 200
+        assert r2.json()[0]["id"] > r1.json()[0]["id"]
+        assert r2.json()[0]["first_name"] == "Bob"
+
+        # Last page is short, so no further cursor is issued
+        r3 = client.get(f"/employees?limit=5&after={cursor}")
+        assert len(r3.json()) == 1
+        assert "X-Next-Cursor" not in r3.headers
+
+        assert client.get("/employees?after=not-a-cursor").status_code == 400
+
+        # Tampered cursors are rejected before they reach the database
+        def forged(payload: str) -> str:
+            return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+        for sort, payload in (
+            ("id", '{"s":"id","v":1,"id":1e400}'),
+            ("id", '{"s":"id","v":1,"id":9223372036854775808}'),
+            ("last_name", '{"s":"last_name","v":{"a":1},"id":1}'),
+            ("hire_date", '{"s":"hire_date","v":5,"id":1}'),
+        ):
+            assert client.get(f"/employees?sort={sort}&after={forged(payload)}").status_code == 400
+        assert client.get("/employees?limit=10001").status_code == 422
+        assert client.get("/employees?skip=-1").status_code == 422
+
+
+def test_employees_filter_search_and_sort():
+    """Test 8: GET /employees filters, searches and sorts in SQL"""
+    loop, async_session_maker = setup_test_env()
+
+    async def seed_more():
+        async with async_session_maker() as session:
+            session.add_all([
+                Employee(employee_id="E003", email="c@example.com", first_name="Carol", last_name="Baker",
+                         department="Sales", position="Manager"),
+                Employee(employee_id="E004", email="d@example.com", first_name="Dan", last_name="Bell",
+                         department="Sales", position="Staff", is_active=False),
+            ])
+            await session.commit()
+
+    loop.run_until_complete(seed_more())
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        r = client.get("/employees?department=Sales")
+        assert [e["employee_id"] for e in r.json()] == ["E003", "E004"]
+
+        r = client.get("/employees?department=Sales&is_active=false")
+        assert [e["employee_id"] for e in r.json()] == ["E004"]
+
+        r = client.get("/employees?position=Engineer")
+        assert [e["employee_id"] for e in r.json()] == ["E001"]
+
+        # Prefix search is case-insensitive and treats wildcards literally
+        r = client.get("/employees?search=BA")
+        assert [e["last_name"] for e in r.json()] == ["Baker"]
+        assert client.get("/employees?search=%25").json() == []
+
+        r = client.get("/employees?sort=-last_name")
+        assert [e["last_name"] for e in r.json()] == ["Brown", "Bell", "Baker", "Anderson"]
+
+        # Cursor pages follow the requested sort order
+        r1 = client.get("/employees?sort=last_name&limit=2")
+        assert [e["last_name"] for e in r1.json()] == ["Anderson", "Baker"]
+        cursor = r1.headers["X-Next-Cursor"]
+        r2 = client.get(f"/employees?sort=last_name&limit=2&after={cursor}")
+        assert [e["last_name"] for e in r2.json()] == ["Bell", "Brown"]
+
+        assert client.get(f"/employees?sort=first_name&after={cursor}").status_code == 400
+        assert client.get("/employees?sort=salary").status_code == 400
+
+        # Cursor pages on a nullable column cross from values into the NULL tail
+        for sort, expected in (("department", ["E003", "E004", "E001", "E002"]),
+                               ("-department", ["E004", "E003", "E002", "E001"])):
+            seen, cursor = [], None
+            while True:
+                r = client.get(f"/employees?sort={sort}&limit=1" + (f"&after={cursor}" if cursor else ""))
+                seen += [e["employee_id"] for e in r.json()]
+                cursor = r.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+            assert seen == expected
+            offset_page = client.get(f"/employees?sort={sort}&skip=1&limit=3").json()
+            assert [e["employee_id"] for e in offset_page] == expected[1:]
+
+
+def test_employee_stats_endpoint():
+    """Test 9: GET /employees/stats aggregates headcount and salary in SQL"""
+    loop, async_session_maker = setup_test_env()
+
+    async def seed_more():
+        async with async_session_maker() as session:
+            session.add_all([
+                Employee(employee_id="E003", email="c@example.com", first_name="Carol", last_name="Baker",
+                         department="Sales", position="Manager"),
+                Employee(employee_id="E004", email="d@example.com", first_name="Dan", last_name="Bell",
+                         department="Sales", position="Staff", is_active=False),
+            ])
+            await session.commit()
+
+    loop.run_until_complete(seed_more())
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        r = client.get("/employees/stats")
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total"] == 4
+        assert data["active"] == 3
+        assert data["recent_hires"] == 3
+        # Engineer + Senior Engineer + Manager, matching the per-row salary map
+        assert data["average_salary"] == round((120_000 + 150_000 + 180_000) / 3)
+
+        sales = next(d for d in data["departments"] if d["department"] == "Sales")
+        assert sales == {
+            "department": "Sales",
+            "headcount": 2,
+            "active": 1,
+            "recent_hires": 1,
+            "average_salary": 180_000,
+        }
+
+        assert client.get("/employees/stats?recent_days=100000000").status_code == 422
+        assert client.get("/employees/stats?recent_days=-1").status_code == 422
+
+
+def test_employee_reads_are_cached_until_write():
+    """Test 10: Employee reads are served from cache and invalidated by writes"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+
+    with TestClient(app, headers=admin_headers()) as client:
+        assert len(client.get("/employees").json()) == 2
+        assert client.get("/employees/1").json()["salary"] == 120_000
+        misses = response_cache.misses
+        assert len(client.get("/employees").json()) == 2
+        assert client.get("/employees/1").status_code == 200
+        assert response_cache.misses == misses
+
+        r = client.post("/employees", json={
+            "employee_id": "E005", "email": "e@example.com", "first_name": "Eve", "last_name": "Evans",
+        })
+        assert r.status_code == 201
+        assert r.json()["salary"] == 110_000
+        assert len(client.get("/employees").json()) == 3
+
+        assert client.get("/employees/999").status_code == 404
+
+
+def test_conditional_get_with_etag():
+    """Test 11: Unchanged employee reads return 304 for a matching If-None-Match"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+
+    with TestClient(app, headers=admin_headers()) as client:
+        for url in ["/employees?limit=5", "/employees/1", "/employees/stats"]:
+            r1 = client.get(url)
+            assert r1.status_code == 200
+            etag = r1.headers["ETag"]
+
+            r2 = client.get(url, headers={"If-None-Match": etag})
+            assert r2.status_code == 304
+            assert r2.content == b""
+            assert r2.headers["ETag"] == etag
+
+        list_etag = client.get("/employees?limit=5").headers["ETag"]
+        assert client.get("/employees?limit=6").headers["ETag"] != list_etag
+
+        # Stats depend on the date as well: a day later the same table is a new version
+        from src.routes import employees
+        stats = client.get("/employees/stats")
+        today = employees.recent_hires_cutoff
+        employees.recent_hires_cutoff = lambda days: today(days) + timedelta(days=1)
+        try:
+            r = client.get("/employees/stats", headers={"If-None-Match": stats.headers["ETag"]})
+            assert r.status_code == 200
+            assert r.headers["ETag"] != stats.headers["ETag"]
+        finally:
+            employees.recent_hires_cutoff = today
+
+        client.post("/employees", json={
+            "employee_id": "E005", "email": "e@example.com", "first_name": "Eve", "last_name": "Evans",
+        })
+        r3 = client.get("/employees?limit=5", headers={"If-None-Match": list_etag})
+        assert r3.status_code == 200
+        assert len(r3.json()) == 3
+
+
+def test_employee_export_streams_ndjson_and_csv():
+    """Test 12: GET /employees/export streams every employee as NDJSON or CSV"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+    import csv
+    import io
+    import json
+
+    with TestClient(app, headers=admin_headers()) as client:
+        r = client.get("/employees/export?format=ndjson")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in r.text.splitlines()]
+        assert [row["employee_id"] for row in rows] == ["E001", "E002"]
+        assert rows[1]["salary"] == 150_000
+        assert set(rows[0]) == set(client.get("/employees/1").json())
+
+        r = client.get("/employees/export?format=csv")
+        assert r.status_code == 200
+        assert "employees.csv" in r.headers["content-disposition"]
+        records = list(csv.DictReader(io.StringIO(r.text)))
+        assert [rec["first_name"] for rec in records] == ["Alice", "Bob"]
+        assert records[0]["salary"] == "120000"
+
+        assert client.get("/employees/export?format=xml").status_code == 400
+
+
+def test_bulk_upsert_reports_per_row_status():
+    """Test 13: POST /employees/bulk upserts rows and reports each one"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+
+    with TestClient(app, headers=admin_headers()) as client:
+        r = client.post("/employees/bulk", json=[
+            {"employee_id": "E001", "email": "a@example.com", "first_name": "Alicia", "last_name": "Anderson"},
+            {"employee_id": "E010", "email": "j@example.com", "first_name": "Jo", "last_name": "Jones"},
+            {"employee_id": "E011", "email": "b@example.com", "first_name": "Ben", "last_name": "Black"},
+            {"employee_id": "E010", "email": "k@example.com", "first_name": "Jo", "last_name": "Jones"},
+            {"employee_id": "E012"},
+        ])
+        assert r.status_code == 200
+        data = r.json()
+        assert (data["created"], data["updated"], data["failed"]) == (1, 1, 3)
+        assert [row["status"] for row in data["results"]] == ["updated", "created", "error", "error", "error"]
+        assert "E002" in data["results"][2]["detail"]
+
+        assert client.get("/employees/1").json()["first_name"] == "Alicia"
+        new_id = data["results"][1]["id"]
+        assert client.get(f"/employees/{new_id}").json()["employee_id"] == "E010"
+
+        ndjson = (
+            b'{"employee_id": "E020", "email": "t@example.com", "first_name": "Tom", "last_name": "Tate"}\n'
+            b'{"employee_id": "E021", "email": "u@example.com", "first_name": "Uma", "last_name": "Udall"}\n'
+        )
+        r = client.post("/employees/bulk", content=ndjson, headers={"Content-Type": "application/x-ndjson"})
+        assert r.json()["created"] == 2
+        assert len(client.get("/employees").json()) == 5
+
+        assert client.post("/employees/bulk", json={"not": "a list"}).status_code == 400
+
+        r = client.post("/employees/bulk", json=[{"employee_id": 5, "email": "n@example.com"}])
+        assert r.status_code == 200
+        assert r.json()["results"][0] == {
+            "index": 0, "employee_id": "5", "status": "error", "id": None, "detail": r.json()["results"][0]["detail"],
+        }
+
+        from src.config import settings
+        limit, settings.bulk_max_bytes = settings.bulk_max_bytes, 64
+        try:
+            assert client.post("/employees/bulk", content=b"[" + b" " * 100 + b"]").status_code == 413
+
+            def chunks():
+                yield b"["
+                yield b" " * 100
+                yield b"]"
+            assert client.post("/employees/bulk", content=chunks()).status_code == 413
+        finally:
+            settings.bulk_max_bytes = limit
+
+
+def test_fast_json_matches_response_model():
+    """Test 14: The orjson fast path returns the same bytes and headers as response_model serialization"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+    from src.config import settings
+    from src.responses import FastJSONResponse
+
+    with TestClient(app) as client:
+        urls = ["/employees?limit=1", "/employees/2"]
+        fast = [client.get(url) for url in urls]
+        settings.fast_json_responses = False
+        render = FastJSONResponse.render
+        # With the toggle off nothing may go through orjson: the baseline is stdlib JSONResponse
+        def refuse(self, content):
+            raise AssertionError("orjson used with fast_json_responses off")
+
+        FastJSONResponse.render = refuse
+        try:
+            loop.run_until_complete(response_cache.invalidate())
+            slow = [client.get(url) for url in urls]
+        finally:
+            FastJSONResponse.render = render
+            settings.fast_json_responses = True
+
+        for f, s in zip(fast, slow):
+            assert f.status_code == s.status_code == 200
+            assert f.content == s.content
+            assert f.headers["content-type"] == s.headers["content-type"]
+            assert f.headers["ETag"] == s.headers["ETag"]
+        assert fast[0].headers["X-Next-Cursor"] == slow[0].headers["X-Next-Cursor"]
+
+
+def test_list_request_debug_is_sampled_and_structured():
+    """Test 15: List diagnostics are only logged when sampled, as CloudWatch JSON"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+    import io
+    import json
+    import logging
+    from src.config import settings
+    from src.utils.logger import CloudWatchFormatter, request_debug_logger
+
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(CloudWatchFormatter())
+    request_debug_logger.addHandler(handler)
+    try:
+        with TestClient(app) as client:
+            client.get("/employees?limit=1")
+            assert stream.getvalue() == ""
+
+            settings.request_debug_sample_rate = 1.0
+            try:
+                client.get("/employees?limit=1&sort=-id")
+            finally:
+                settings.request_debug_sample_rate = 0.0
+    finally:
+        request_debug_logger.removeHandler(handler)
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["message"] == "list_employees"
+    assert record["debug"]["params"]["sort"] == "-id"
+    assert record["debug"]["rows"] == 1
+    assert record["debug"]["cache"] == "miss"
+
+
+def test_metrics_endpoint_reports_routes_sizes_and_db_time():
+    """Test 16: /metrics exposes per-route latency, size, in-flight and DB time"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+    from src.metrics import MetricsMiddleware, registry
+    from src.routes import health
+
+    database.instrument_engine(database.engine)
+    app.include_router(health.router)
+    app.add_middleware(MetricsMiddleware)
+    registry.reset()
+
+    with TestClient(app) as client:
+        body = client.get("/employees/1").content
+        client.get("/employees/999")
+        client.get("/no/such/path")
+        r = client.get("/metrics")
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_requests_total{method="GET",route="/employees/{employee_id}",status="200"} 1' in text
+    assert 'http_requests_total{method="GET",route="/employees/{employee_id}",status="404"} 1' in text
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/employees/{employee_id}"} 2' in text
+    assert f'http_response_size_bytes_sum{{method="GET",route="/employees/{{employee_id}}"}} {len(body) + 31}' in text
+    assert 'http_requests_in_flight 1' in text  # the /metrics request itself
+    statements = [line for line in text.splitlines()
+                  if line.startswith('db_statements_total{method="GET",route="/employees/{employee_id}"}')]
+    assert statements and int(statements[0].split()[-1]) >= 2
+    assert 'db_pool_events_total{event="checkouts"}' in text
+
+
+def test_sql_profiler_server_timing_and_repeated_statements():
+    """Test 17: Sampled requests get Server-Timing and a SQL summary flagging repeated statements"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi import Depends
+    from fastapi.testclient import TestClient
+    import io
+    import json
+    import logging
+    from src.config import settings
+    from src.profiler import SqlProfilerMiddleware
+    from src.utils.logger import CloudWatchFormatter, request_debug_logger
+
+    database.instrument_engine(database.engine)
+    app.add_middleware(SqlProfilerMiddleware)
+
+    @app.get("/n-plus-one")
+    async def n_plus_one(db=Depends(database.get_db)):
+        for employee_id in (1, 2, 1):
+            await db.execute(select(Employee).where(Employee.id == employee_id))
+        return {}
+
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(CloudWatchFormatter())
+    request_debug_logger.addHandler(handler)
+    try:
+        with TestClient(app) as client:
+            assert "Server-Timing" not in client.get("/employees/1").headers
+            settings.sql_profiler_sample_rate = 1.0
+            try:
+                timed = client.get("/employees/2")
+                client.get("/n-plus-one")
+            finally:
+                settings.sql_profiler_sample_rate = 0.0
+    finally:
+        request_debug_logger.removeHandler(handler)
+
+    assert timed.headers["Server-Timing"].startswith("db;dur=")
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["level"] for r in records] == ["DEBUG", "WARNING"]
+    assert records[0]["debug"]["route"] == "/employees/{employee_id}"
+    assert records[0]["debug"]["statements"] >= 1
+    repeated = records[1]["debug"]["repeated"]
+    assert len(repeated) == 1 and repeated[0]["count"] == 3
+    assert repeated[0]["sql"].startswith("SELECT employees.id")
+    assert records[1]["debug"]["slowest"]
+
+
+def test_login_uses_hashed_users_table():
+    """Test 18: Login is case-insensitive on email, stores only bcrypt hashes and upgrades work factors"""
+    loop, async_session_maker = setup_test_env()
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.models import User
+    from src.routes import auth
+
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/v1")
+
+    async def stored_hash(email):
+        async with async_session_maker() as session:
+            return (await session.execute(select(User.password_hash).where(User.email == email))).scalar_one()
+
+    original = loop.run_until_complete(stored_hash("sarah.chen@blackflag.hr"))
+    assert original.startswith("$2b$04$") and "Admin123!" not in original
+
+    with TestClient(app) as client:
+        r = client.post("/api/v1/auth/login", json={"email": "  Sarah.Chen@BlackFlag.HR ", "password": "Admin123!"})
+        assert r.status_code == 200
+        assert r.json()["user"]["email"] == "sarah.chen@blackflag.hr"
+
+        wrong = client.post("/api/v1/auth/login", json={"email": "sarah.chen@blackflag.hr", "password": "admin123!"})
+        assert wrong.status_code == 401
+
+        password_hasher.rounds = 5
+        try:
+            assert client.post("/api/v1/auth/login", json={
+                "email": "sarah.chen@blackflag.hr", "password": "Admin123!",
+            }).status_code == 200
+        finally:
+            password_hasher.rounds = 4
+
+    assert loop.run_until_complete(stored_hash("sarah.chen@blackflag.hr")).startswith("$2b$05$")
+
+
+def test_bearer_tokens_authorize_without_database_lookups():
+    """Test 19: Login issues a JWT that employee routes accept without SQL for identity; logout revokes it"""
+    setup_test_env()
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from src.config import settings
+    from src.routes import auth, employees
+    from src.security import token_service
+
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/v1")
+    app.include_router(employees.router, prefix="/api/v1")
+
+    statements = []
+    event.listen(database.engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    try:
+        with TestClient(app) as client:
+            # Writes and the export need an hr_admin token even when anonymous reads are allowed
+            new_employee = {"employee_id": "T900", "email": "t900@blackflag.hr", "first_name": "T", "last_name": "Nine"}
+            assert client.get("/api/v1/employees/999").status_code == 404
+            assert client.post("/api/v1/employees", json=new_employee).status_code == 401
+            assert client.post("/api/v1/employees/bulk", json=[new_employee]).status_code == 401
+            assert client.get("/api/v1/employees/export").status_code == 401
+
+            settings.auth_required = True
+            assert client.get("/api/v1/employees/1").status_code == 401
+            assert client.get("/api/v1/employees/1", headers={"Authorization": "Bearer not.a.jwt"}).status_code == 401
+
+            login = client.post("/api/v1/auth/login", json={"email": "marcus.johnson@blackflag.hr", "password": "Staff123!"})
+            body = login.json()
+            assert body["token_type"] == "bearer" and body["expires_in"] > 0
+            headers = {"Authorization": f"Bearer {body['access_token']}"}
+            assert client.get("/api/v1/auth/me", headers=headers).json()["role"] == "employee"
+
+            settings.auth_required = False
+            assert client.get("/api/v1/employees/999").status_code == 404
+            statements.clear()
+            assert client.get("/api/v1/employees/1").status_code == 200
+            anonymous = len(statements)
+            settings.auth_required = True
+            statements.clear()
+            assert client.get("/api/v1/employees/2", headers=headers).status_code == 200
+            assert len(statements) == anonymous
+
+            assert client.post("/api/v1/employees", headers=headers, json=new_employee).status_code == 403
+            assert client.get("/api/v1/employees/export", headers=headers).status_code == 403
+
+            assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+            assert client.get("/api/v1/employees/2", headers=headers).status_code == 401
+    finally:
+        settings.auth_required = False
+        token_service.clear()
+
+
+def test_compression_middleware():
+    """Test 20: Large JSON bodies are compressed per Accept-Encoding; small and streamed bodies pass through"""
+    loop, async_session_maker = setup_test_env()
+    from fastapi.testclient import TestClient
+    from src.compression import CompressionMiddleware
+
+    app = get_test_app(async_session_maker)
+    # thread_min_size=0 sends every compressed body through the executor
+    app.add_middleware(CompressionMiddleware, min_size=400, thread_min_size=0)
+
+    with TestClient(app, headers=admin_headers()) as client:
+        plain = client.get("/employees", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert "Accept-Encoding" in plain.headers["vary"]
+
+        compressed = client.get("/employees", headers={"Accept-Encoding": "br;q=0, gzip;q=0.8"})
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert int(compressed.headers["content-length"]) < len(plain.content)
+        assert compressed.json() == plain.json()
+
+        small = client.get("/employees/1", headers={"Accept-Encoding": "gzip"})
+        assert small.status_code == 200 and "content-encoding" not in small.headers
+
+        streamed = client.get("/employees/export", headers={"Accept-Encoding": "gzip"})
+        assert streamed.status_code == 200 and "content-encoding" not in streamed.headers
+        assert len(streamed.text.splitlines()) == 2
+
+
+def test_reads_pinned_to_primary_skip_cache_and_etags(monkeypatch):
+    """Test 21: Clients inside their read-your-writes window bypass the shared cache and ETags"""
+    loop, async_session_maker = setup_test_env()
+    # Pinning only applies with replicas configured; this one is down, so
+    # every read is served by the in-memory primary
+    router = database.ReplicaRouter(["sqlite+aiosqlite:///unused-replica.db"], retry_seconds=60)
+    router.replicas[0].down_until = float("inf")
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+    from sqlalchemy import update
+
+    async def rename_behind_cache():
+        # A write the cache has not seen, as when another client refilled it from a lagging replica
+        async with async_session_maker() as session:
+            await session.execute(update(Employee).where(Employee.id == 1).values(first_name="Alicia"))
+            await session.commit()
+
+    with TestClient(app) as client:
+        first = client.get("/employees/1")
+        etag = first.headers["ETag"]
+        loop.run_until_complete(rename_behind_cache())
+
+        assert client.get("/employees/1").json()["first_name"] == "Alice"
+        assert client.get("/employees/1", headers={"If-None-Match": etag}).status_code == 304
+
+        pinned = {database.READ_PRIMARY_HEADER: database.read_primary_token(time.time() + 2)}
+        # Ignored while no replicas are configured
+        assert client.get("/employees/1", headers={**pinned, "If-None-Match": etag}).status_code == 304
+        monkeypatch.setattr(database, "replica_router", router)
+        fresh = client.get("/employees/1", headers={**pinned, "If-None-Match": etag})
+        assert fresh.status_code == 200 and fresh.json()["first_name"] == "Alicia"
+        assert "ETag" not in fresh.headers
+
+
+def test_cached_reads_take_no_pool_connection():
+    """Test 22: Cache hits and 304s answer without checking out a database connection"""
+    loop, async_session_maker = setup_test_env()
+    app = get_test_app(async_session_maker)
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    checkouts = []
+    event.listen(database.engine.sync_engine, "checkout", lambda *args: checkouts.append(1))
+
+    with TestClient(app) as client:
+        etag = client.get("/employees/1").headers["ETag"]
+        assert checkouts
+
+        checkouts.clear()
+        for _ in range(10):
+            assert client.get("/employees/1").status_code == 200
+        assert client.get("/employees/1", headers={"If-None-Match": etag}).status_code == 304
+        assert checkouts == []
@@ -0,0 +1,86 @@
+import io
+import json
+import logging
+import queue
+import sys
+from pathlib import Path
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+from src.utils.logger import QueuedHandler, request_context, setup_logging, shutdown_logging
+
+
+def read_records(stream: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_queued_pipeline_writes_cloudwatch_json_with_request_fields():
+    """Records are written as JSON by the listener thread, with request context and tracebacks"""
+    stream = io.StringIO()
+    setup_logging("INFO", batch_size=2, stream=stream)
+    log = logging.getLogger("test.pipeline")
+    token = request_context.set({"request_id": "req-1", "method": "GET"})
+    try:
+        log.info("hello %s", "world")
+        log.debug("below level")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("failed")
+    finally:
+        request_context.reset(token)
+    log.info("outside request")
+    shutdown_logging()
+
+    records = read_records(stream)
+    assert [r["message"] for r in records] == ["hello world", "failed", "outside request"]
+    assert records[0]["request_id"] == "req-1" and records[0]["method"] == "GET"
+    assert "ValueError: boom" in records[1]["exception"]
+    assert "request_id" not in records[2]
+    assert records[0]["timestamp"] <= records[2]["timestamp"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """A full queue drops records according to the drop policy and counts them"""
+    for policy, kept in (("newest", ["a", "b"]), ("oldest", ["b", "c"])):
+        log_queue = queue.Queue(maxsize=2)
+        handler = QueuedHandler(log_queue, drop_policy=policy)
+        for message in ("a", "b", "c"):
+            handler.handle(logging.LogRecord("t", logging.INFO, __file__, 0, message, None, None))
+        assert handler.dropped == 1
+        assert [log_queue.get_nowait().msg for _ in range(2)] == kept
+
+
+def test_request_middleware_adds_request_id_route_and_latency():
+    """Every request gets an X-Request-ID and one access record with route, status and latency"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.middleware import RequestContextMiddleware
+
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        logging.getLogger("test.route").info("loading item")
+        return {"id": item_id}
+
+    stream = io.StringIO()
+    setup_logging("INFO", stream=stream)
+    with TestClient(app) as client:
+        generated = client.get("/items/7")
+        forwarded = client.get("/items/8", headers={"X-Request-ID": "abc-123"})
+        rejected = client.get("/items/9", headers={"X-Request-ID": "bad id\nforged"})
+    shutdown_logging()
+
+    records = read_records(stream)
+    access = [r for r in records if r["logger"] == "access"]
+    inner = [r for r in records if r["logger"] == "test.route"]
+    assert len(access) == len(inner) == 3
+    assert access[0]["request_id"] == generated.headers["X-Request-ID"] == inner[0]["request_id"]
+    assert access[0]["route"] == "/items/{item_id}"
+    assert access[0]["status_code"] == 200
+    assert access[0]["latency_ms"] >= 0
+    assert forwarded.headers["X-Request-ID"] == "abc-123" == access[1]["request_id"]
+    assert rejected.headers["X-Request-ID"] != "bad id\nforged"
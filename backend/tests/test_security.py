@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+os.environ.setdefault("DB_USERNAME", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from src.security import PasswordHasher, TokenService
+
+
+def test_hash_verify_and_rehash_policy():
+    """Hashes verify only their own password and carry the configured work factor"""
+    hasher = PasswordHasher(rounds=4)
+
+    async def run():
+        hashed = await hasher.hash("Staff123!")
+        return hashed, await hasher.verify("Staff123!", hashed), await hasher.verify("staff123!", hashed)
+
+    hashed, good, bad = asyncio.run(run())
+    assert hashed.startswith("$2b$04$")
+    assert good and not bad
+    assert not hasher.needs_rehash(hashed)
+    hasher.rounds = 6
+    assert hasher.needs_rehash(hashed)
+    assert not asyncio.run(hasher.verify("Staff123!", "not-a-bcrypt-hash"))
+
+
+def test_verification_cache_and_off_loop_execution():
+    """Successful verifications are cached; bcrypt runs in the executor threads"""
+    hasher = PasswordHasher(rounds=4, workers=2, cache_seconds=60)
+    threads = set()
+    import src.security as security
+    checkpw = security.bcrypt.checkpw
+
+    def recording_checkpw(password, hashed):
+        threads.add(threading.current_thread().name)
+        return checkpw(password, hashed)
+
+    async def run():
+        hashed = await hasher.hash("Admin123!")
+        security.bcrypt.checkpw = recording_checkpw
+        try:
+            results = await asyncio.gather(*(hasher.verify("Admin123!", hashed) for _ in range(3)))
+            cached = await hasher.verify("Admin123!", hashed)
+            wrong = await hasher.verify("nope", hashed)
+        finally:
+            security.bcrypt.checkpw = checkpw
+        return results, cached, wrong
+
+    results, cached, wrong = asyncio.run(run())
+    assert all(results) and cached and not wrong
+    assert hasher.cache_hits == 1
+    assert threads and all(name.startswith("bcrypt") for name in threads)
+
+
+def test_token_service_requires_a_shared_secret_outside_dev():
+    """Without secret_key every task would sign with its own key, so startup fails unless in dev"""
+    with pytest.raises(RuntimeError, match="secret_key"):
+        TokenService(None, require_secret=True)
+    dev = TokenService(None)
+    token = dev.issue(1, "a@blackflag.hr", "A", "employee")
+    assert dev.validate(token).role == "employee"
+    assert TokenService("other-key").validate(token) is None
@@ -1,4 +1,5 @@
 import { createContext, useContext, useState, useEffect, ReactNode } from 'react'
+import axios from 'axios'
 import {
   Employee,
   LeaveBalance,
@@ -21,7 +22,7 @@ import {
   generateId,
   generateEmployeeId,
 } from '../data/mockData'
-import { getEmployees } from '../services/api'
+import { getEmployees, login as loginApi, logout as logoutApi } from '../services/api'
 
 // Toggle API usage; default to mock data to keep the curated 100 users
 const USE_API = import.meta.env.VITE_USE_API === 'true'
@@ -38,7 +39,7 @@ interface AppContextType {
   // User
   user: User | null
   isAuthenticated: boolean
-  login: (email: string, password: string) => boolean
+  login: (email: string, password: string) => Promise<boolean>
   logout: () => void
 
   // Employees
@@ -198,10 +199,10 @@ export function AppProvider({ children }: { children: ReactNode }) {
 
   // Auth functions
   const login = async (email: string, password: string): Promise<boolean> => {
-    // Try backend auth first if API is enabled
+    // Try backend auth first if API is enabled; it issues the bearer token
+    // api.ts sends on employee writes and exports
     if (USE_API) {
       try {
-        const { loginApi } = await import('../services/api')
         const response = await loginApi(email, password)
         if (response.success && response.user) {
           setUser({
@@ -218,8 +219,12 @@ export function AppProvider({ children }: { children: ReactNode }) {
           return true
         }
       } catch (error) {
+        if (axios.isAxiosError(error) && error.response?.status === 401) {
+          addNotification('Invalid email or password', 'error')
+          return false
+        }
         console.error('Backend auth failed:', error)
-        // Fall through to mock auth
+        // Backend unreachable: fall through to mock auth
       }
     }
 
@@ -276,6 +281,10 @@ export function AppProvider({ children }: { children: ReactNode }) {
   }
 
   const logout = () => {
+    if (USE_API) {
+      // Revokes the bearer token; it is dropped locally even if this fails
+      logoutApi().catch(error => console.error('Backend logout failed:', error))
+    }
     setIsAuthenticated(false)
     setUser(null)
     addNotification('You have been signed out.', 'info')
@@ -17,7 +17,7 @@ export default function NewSignIn() {
 
     await new Promise(resolve => setTimeout(resolve, 600))
 
-    if (login(email, password)) {
+    if (await login(email, password)) {
       navigate('/dashboard')
     } else {
       setError('Please enter both email and password')
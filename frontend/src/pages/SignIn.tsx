@@ -19,7 +19,7 @@ export default function SignIn() {
       // Simulate API call delay
       await new Promise(resolve => setTimeout(resolve, 500))
 
-      const success = login(email, password)
+      const success = await login(email, password)
       if (success) {
         navigate('/dashboard')
       } else {
@@ -10,9 +10,50 @@ const api = axios.create({
   },
 })
 
+// Read-your-writes: after a write the API returns X-Read-Primary-Until, a
+// signed "<deadline>.<signature>" token, and reads that echo it until the
+// deadline are served from the primary database. The API's cookie with the
+// same value is not sent cross-origin, so keep it here.
+const READ_PRIMARY_HEADER = 'x-read-primary-until'
+let readPrimaryToken = ''
+let readPrimaryUntil = 0
+
+// Bearer token from the last login; creating, importing and exporting
+// employees are rejected without one. Kept in localStorage alongside the
+// signed-in user (see AppContext) so it survives a page reload.
+const TOKEN_STORAGE_KEY = 'blackflag-hr-token'
+let accessToken: string | null = localStorage.getItem(TOKEN_STORAGE_KEY)
+
+const setAccessToken = (token: string | null) => {
+  accessToken = token
+  if (token) {
+    localStorage.setItem(TOKEN_STORAGE_KEY, token)
+  } else {
+    localStorage.removeItem(TOKEN_STORAGE_KEY)
+  }
+}
+
+api.interceptors.request.use((config) => {
+  if (accessToken) {
+    config.headers.set('Authorization', `Bearer ${accessToken}`)
+  }
+  if (readPrimaryUntil > Date.now() / 1000) {
+    config.headers.set(READ_PRIMARY_HEADER, readPrimaryToken)
+  }
+  return config
+})
+
 // Response interceptor for error handling
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const token = response.headers[READ_PRIMARY_HEADER]
+    const until = token ? parseFloat(token) : 0
+    if (until > readPrimaryUntil) {
+      readPrimaryToken = token
+      readPrimaryUntil = until
+    }
+    return response
+  },
   (error) => {
     console.error('API Error:', error)
     return Promise.reject(error)
@@ -34,17 +75,36 @@ export const checkReady = async () => {
 // Auth API calls
 export const login = async (email: string, password: string) => {
   const response = await api.post('/api/v1/auth/login', { email, password })
+  setAccessToken(response.data.access_token ?? null)
   return response.data
 }
 
 export const logout = async () => {
-  const response = await api.post('/api/v1/auth/logout')
-  return response.data
+  try {
+    const response = await api.post('/api/v1/auth/logout')
+    return response.data
+  } finally {
+    setAccessToken(null)
+  }
 }
 
 // Employee API calls
-export const getEmployees = async (skip = 0, limit = 1000) => {
-  const response = await api.get(`/api/v1/employees?skip=${skip}&limit=${limit}`)
+export interface EmployeeQuery {
+  department?: string
+  position?: string
+  is_active?: boolean
+  search?: string
+  sort?: string
+  after?: string
+}
+
+export const getEmployees = async (skip = 0, limit = 1000, query: EmployeeQuery = {}) => {
+  const response = await api.get('/api/v1/employees', { params: { skip, limit, ...query } })
+  return response.data
+}
+
+export const getEmployeeStats = async (recentDays = 90) => {
+  const response = await api.get('/api/v1/employees/stats', { params: { recent_days: recentDays } })
   return response.data
 }
 
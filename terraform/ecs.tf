@@ -91,7 +91,9 @@ resource "aws_iam_role_policy" "ecs_secrets_access" {
       ]
       Resource = [
         aws_secretsmanager_secret.db_credentials.arn,
-        "${aws_secretsmanager_secret.db_credentials.arn}*"
+        "${aws_secretsmanager_secret.db_credentials.arn}*",
+        aws_secretsmanager_secret.app_secrets.arn,
+        "${aws_secretsmanager_secret.app_secrets.arn}*"
       ]
     }]
   })
@@ -173,6 +175,11 @@ resource "aws_ecs_task_definition" "backend" {
       {
         name      = "DB_PASSWORD"
         valueFrom = "${aws_secretsmanager_secret.db_credentials.arn}:password::"
+      },
+      {
+        # Shared by every task so access tokens validate on any of them
+        name      = "SECRET_KEY"
+        valueFrom = "${aws_secretsmanager_secret.app_secrets.arn}:jwt_secret::"
       }
     ]
 
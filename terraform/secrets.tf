@@ -21,7 +21,7 @@ resource "aws_secretsmanager_secret_version" "db_credentials" {
   })
 }
 
-# Application Secrets (for future use)
+# Application Secrets (jwt_secret is the backend's SECRET_KEY)
 resource "aws_secretsmanager_secret" "app_secrets" {
   name_prefix             = "${local.resource_prefix}-app-secrets-"
   description             = "Application secrets for ${local.resource_prefix}"